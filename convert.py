@@ -1,57 +1,291 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-CSV到JSON转换工具 - 简化版
-直接执行即可完成转换，您只需维护 config/mapping_config.json 配置文件
+CSV到JSON转换工具 - 命令行版
+不带参数时转换data目录下的CSV到output目录，您只需维护 config/mapping_config.json 配置文件；
+也可以指定输入文件、输出格式和并行数，用 - 表示标准输入/标准输出，放进Unix管道中使用
 """
 
-import sys
-import os
+import argparse
+import contextlib
+import csv
 import glob
+import importlib
+import io
+import itertools
+import logging
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, TextIO
 
 # 添加src目录到路径
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
+from csv_index import CSVRowIndex
 from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import DirectorySink, MemorySink
+from output_validator import OutputValidationError, raise_for_issues
+from sharded_convert import iter_sharded_chunks, iter_worker_results, project_chunk
+from spill import SpillTable, dump_records
+
+# 输出格式
+FORMATS = ("json", "yaml", "jsonl")
+# 子命令 -> 模块，子命令之后的参数原样交给模块的main
+SUBCOMMANDS = {
+    "diff": "sheet_diff",
+    "merge": "result_merge",
+    "export": "bulk_export",
+    "serve": "http_service",
+    "query": "project_store",
+}
+# 不带输入参数时各格式的默认输出文件
+DEFAULT_OUTPUT_NAMES = {"json": "result.json", "yaml": "config.yaml", "jsonl": "result.jsonl"}
+# 校验未通过时最多列出的问题数
+MAX_REPORTED_ISSUES = 20
+
+
+def open_input(path: str) -> TextIO:
+    """打开输入，- 为标准输入（读到一行处理一行，不等待输入结束）"""
+    if path == "-":
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_input_rows(converter: CSVToJSONConverter, path: str) -> Iterator[List[str]]:
+    """
+    逐行产出一个输入的CSV行；筛选了版本且文件已有行偏移索引时，只读取选中的项目块
+    """
+    if path != "-" and converter.selected_versions is not None:
+        index = CSVRowIndex.load(path)
+        if index is not None:
+            yield from converter.iter_selected_rows(index)
+            return
+    with open_input(path) as f:
+        yield from csv.reader(f)
+
 
-def main():
+def iter_chunks(converter: CSVToJSONConverter, path: str, fmt: str,
+                issues: Optional[List[str]] = None) -> Iterator[tuple]:
     """
-    主函数：执行CSV到JSON转换
+    逐个项目产出一个输入的 (项目ID, 输出片段)，每个项目块读完后立即产出
+
+    json为result.json中该项目的片段，jsonl为一行，yaml为第一个项目的完整文档（项目ID为None）；
+    issues为启用校验时收集问题的列表，为None时该输入有问题则在产出完后抛出OutputValidationError
+    """
+    with contextlib.closing(iter_input_rows(converter, path)) as rows:
+        if fmt == "yaml":
+            yield None, converter.convert_rows_to_yaml(rows, issues)
+            return
+        for project_id, project_data in converter.iter_projects(rows, issues):
+            yield project_id, project_chunk(converter, project_id, project_data, fmt)
+
+
+def write_chunks(chunks: Iterable[tuple], fmt: str, out: TextIO, flush: bool = False,
+                 memory_limit: Optional[int] = None) -> int:
+    """
+    把片段写入输出流，返回片段数
+
+    jsonl和yaml边转换边写出，yaml文档之间用 --- 分隔；json的项目合并为一个对象，
+    同一项目ID以最后一次为准（与convert_csv_to_json的输出一致），因此全部转换完成后才写出，
+    超过memory_limit的片段暂存在临时磁盘
     """
-    print("=== CSV到JSON转换工具 ===")
+    if fmt == "json":
+        with SpillTable(memory_limit) as projects:
+            for project_id, chunk in chunks:
+                projects.append("", project_id, chunk)
+            count = 0
+            for _, chunk, _ in projects.iter_unique(""):
+                out.write(",\n" if count else "{\n")
+                out.write(chunk)
+                count += 1
+            out.write("\n}" if count else "{}")
+        return count
 
-    # 初始化转换器
-    converter = CSVToJSONConverter()
+    count = 0
+    for _, chunk in chunks:
+        if fmt == "yaml" and count:
+            out.write("\n---\n")
+        out.write(chunk)
+        count += 1
+        if flush:
+            out.flush()
+    return count
 
-    # 自动查找data文件夹下的CSV文件
-    csv_files = glob.glob("data/*.csv")
 
+# 子进程中复用的转换器
+_worker_converter = None
+
+
+def _init_worker(config_file: str, memory_limit: Optional[int], versions: Optional[List[str]] = None,
+                 groups: Optional[List[str]] = None, validate: bool = False):
+    """子进程初始化：只加载一次配置"""
+    global _worker_converter
+    _worker_converter = CSVToJSONConverter(config_file, output_sink=MemorySink(), memory_limit=memory_limit,
+                                           versions=versions, groups=groups, validate=validate)
+
+
+def _convert_file(path: str, fmt: str, spill_dir: Optional[str] = None):
+    """
+    在子进程中转换一个文件，校验未通过时抛出OutputValidationError
+
+    spill_dir为空时返回片段列表；否则片段写入其中的临时文件，返回文件路径（见spill.dump_records）
+    """
+    chunks = iter_chunks(_worker_converter, path, fmt)
+    return dump_records(chunks, spill_dir) if spill_dir is not None else list(chunks)
+
+
+def convert_inputs(inputs: List[str], fmt: str, out: TextIO, config_file: str,
+                   jobs: int = 1, flush: bool = False, memory_limit: Optional[int] = None,
+                   versions: Optional[List[str]] = None, groups: Optional[List[str]] = None,
+                   validate: bool = False) -> int:
+    """
+    转换全部输入并按输入顺序写入输出流，返回片段数
+
+    jobs大于1且有多个文件输入时，每个文件在单独的进程中转换；只有一个文件时，
+    按Version块切成分片并行转换（yaml只需要第一个项目，不分片；筛选了版本时只读取选中的块，也不分片）；
+    否则在当前进程中边读边写。versions和groups为转换器的解析范围筛选。
+    并行转换且memory_limit生效时，子进程的片段经临时磁盘文件交回，内存占用不随输出增长
+
+    validate为True时校验每个项目和YAML参数，全部写出后有问题则抛出OutputValidationError
+    （写入文件时在提交前抛出，不会留下未通过校验的输出）
+    """
+    if jobs > 1 and len(inputs) == 1 and inputs[0] != "-" and fmt != "yaml" and versions is None:
+        chunks = iter_sharded_chunks(inputs[0], fmt, jobs, config_file, memory_limit, groups, validate)
+        return write_chunks(chunks, fmt, out, flush, memory_limit)
+    if jobs > 1 and len(inputs) > 1 and "-" not in inputs:
+        spill_context = tempfile.TemporaryDirectory() if memory_limit is not None else contextlib.nullcontext()
+        with spill_context as spill_dir, \
+                ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                    initargs=(config_file, memory_limit, versions, groups, validate)) as executor:
+            results = executor.map(_convert_file, inputs, itertools.repeat(fmt), itertools.repeat(spill_dir))
+            return write_chunks(iter_worker_results(results, spill_dir), fmt, out, flush, memory_limit)
+
+    converter = CSVToJSONConverter(config_file, output_sink=MemorySink(), memory_limit=memory_limit,
+                                   versions=versions, groups=groups, validate=validate)
+    # 全部输入的问题一起收集，写完后统一报告
+    issues = [] if validate else None
+    chunks = itertools.chain.from_iterable(iter_chunks(converter, path, fmt, issues) for path in inputs)
+    count = write_chunks(chunks, fmt, out, flush, memory_limit)
+    raise_for_issues(issues)
+    return count
+
+
+def convert_default(config_file: str, quiet: bool = False, jobs: int = 1,
+                    memory_limit: Optional[int] = None) -> int:
+    """
+    不带输入参数时：转换data目录下的第一个CSV，result.json和config.yaml写入output目录
+
+    result.json边转换边写出，jobs大于1时按Version块分片并行转换；memory_limit为转换器的内存上限
+    """
+    csv_files = sorted(glob.glob("data/*.csv"))
     if not csv_files:
-        print("❌ 在data文件夹下未找到CSV文件")
+        print("❌ 在data文件夹下未找到CSV文件", file=sys.stderr)
         return 1
 
-    # 使用第一个找到的CSV文件
     csv_file = csv_files[0]
+    sink = DirectorySink("output")
+    converter = CSVToJSONConverter(config_file, memory_limit=memory_limit)
+    if jobs > 1:
+        with sink.open("result.json") as out:
+            convert_inputs([csv_file], "json", out, config_file, jobs, memory_limit=memory_limit)
+        # 分片转换不生成config.yaml，单独取第一个项目生成
+        converter.convert_csv_to_yaml(csv_file, sink=sink, silent=True)
+    else:
+        with open(csv_file, 'r', encoding='utf-8') as f, sink.open("result.json") as out:
+            converter.write_rows_to_json(csv.reader(f), out, sink=sink)
+    if not quiet:
+        print(f"✅ 转换完成: {csv_file} -> {sink.path_for('result.json')}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    主函数：解析命令行并执行转换或子命令
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        module = importlib.import_module(SUBCOMMANDS[argv[0]])
+        return module.main(argv[1:], prog=f"convert.py {argv[0]}")
 
-    # 输出JSON文件路径
-    output_file = "output/result.json"
+    parser = argparse.ArgumentParser(
+        prog="convert.py",
+        description="把编译选项CSV转换为JSON、YAML或JSONL",
+        epilog=f"子命令: {', '.join(SUBCOMMANDS)}（如 convert.py diff old.csv new.csv，"
+               f"用 convert.py <子命令> -h 查看参数）")
+    parser.add_argument("inputs", nargs="*",
+                        help="输入CSV文件，- 为标准输入；省略时转换data目录下的第一个CSV到output目录")
+    parser.add_argument("-f", "--format", choices=FORMATS, default="json", help="输出格式（默认json）")
+    parser.add_argument("-o", "--output", help="输出文件，- 为标准输出；指定输入时默认为标准输出")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="并行转换的进程数（多个文件时每个文件一个进程，单个文件时按Version块分片）")
+    parser.add_argument("--version", dest="versions", action="append", metavar="VERSION",
+                        help="只转换指定版本号的项目，可重复；输入已有行偏移索引（.rowidx）时其余项目块不读取")
+    parser.add_argument("--groups", metavar="GROUP[,GROUP...]",
+                        help="只解析指定的分组（逗号分隔，如 Sensor_Type,Trans），其余分组的行直接跳过")
+    parser.add_argument("--memory-limit", type=int, metavar="MB",
+                        help="内存中累积数据的上限（MB），超过后暂存到临时磁盘")
+    parser.add_argument("--validate", action="store_true",
+                        help="按映射配置校验每个项目和YAML参数（型号目录、通信类型、版本约束、YAML写法），有问题时返回1")
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出提示信息和转换器的警告")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    args = parser.parse_args(argv)
 
+    if args.jobs < 1:
+        parser.error("--jobs 必须大于0")
+    if args.quiet:
+        # 转换器的警告也不输出
+        logging.getLogger("csv_to_json_converter").setLevel(logging.CRITICAL)
+    memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit is not None else None
+    groups = [group.strip() for group in args.groups.split(",") if group.strip()] if args.groups else None
+
+    if not args.inputs:
+        if (args.output is None and args.format == "json" and args.versions is None and groups is None
+                and not args.validate):
+            return convert_default(args.config, args.quiet, args.jobs, memory_limit)
+        csv_files = sorted(glob.glob("data/*.csv"))
+        if not csv_files:
+            print("❌ 在data文件夹下未找到CSV文件", file=sys.stderr)
+            return 1
+        args.inputs = csv_files[:1]
+        if args.output is None:
+            args.output = os.path.join("output", DEFAULT_OUTPUT_NAMES[args.format])
+
+    output = args.output or "-"
     try:
-        # 执行转换
-        print(f"正在转换: {csv_file}")
-        converter.convert_csv_to_json(csv_file, output_file)
-        print(f"\n✅ 转换完成！")
-        print(f"📁 输出文件: {output_file}")
-        print(f"⚙️  配置文件: config/mapping_config.json")
-        
+        if output == "-":
+            count = convert_inputs(args.inputs, args.format, sys.stdout, args.config, args.jobs,
+                                   flush=True, memory_limit=memory_limit, versions=args.versions, groups=groups,
+                                   validate=args.validate)
+            if args.format != "jsonl":
+                sys.stdout.write("\n")
+            sys.stdout.flush()
+        else:
+            sink = DirectorySink(os.path.dirname(output) or ".")
+            with sink.open(os.path.basename(output)) as out:
+                count = convert_inputs(args.inputs, args.format, out, args.config, args.jobs,
+                                       memory_limit=memory_limit, versions=args.versions, groups=groups,
+                                       validate=args.validate)
     except FileNotFoundError as e:
-        print(f"❌ 文件未找到: {e}")
-        print("请确保CSV文件存在于 data/ 目录中")
-    except Exception as e:
-        print(f"❌ 转换失败: {e}")
+        print(f"❌ 文件未找到: {e.filename}", file=sys.stderr)
+        return 1
+    except OutputValidationError as e:
+        print(f"❌ {e}:", file=sys.stderr)
+        for issue in e.issues[:MAX_REPORTED_ISSUES]:
+            print(f"  {issue}", file=sys.stderr)
+        if len(e.issues) > MAX_REPORTED_ISSUES:
+            print(f"  ……其余 {len(e.issues) - MAX_REPORTED_ISSUES} 处未列出", file=sys.stderr)
         return 1
-    
+    except BrokenPipeError:
+        # 下游提前关闭了管道（如 | head），不再输出
+        sys.stdout = open(os.devnull, 'w')
+        return 0
+
+    if not args.quiet:
+        unit = "个文档" if args.format == "yaml" else "个项目"
+        print(f"✅ 已转换 {len(args.inputs)} 个输入，共 {count} {unit} -> {output}", file=sys.stderr)
     return 0
 
+
 if __name__ == "__main__":
-    exit(main())
\ No newline at end of file
+    exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准脚本 - 在合成数据上对比转换器各路径的耗时
+"""
+
+import csv
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import DirectorySink, MemorySink
+from sharded_convert import convert_csv_sharded, iter_shard_chunks, shard_ranges
+
+
+def make_param_values(count: int, seed: int = 0) -> list:
+    """生成参数值列（整数、浮点数、科学计数法、字符串和二维数组混合）"""
+    rnd = random.Random(seed)
+    makers = [
+        lambda: str(rnd.randint(-1000, 1000)),
+        lambda: f"{rnd.uniform(-10, 10):.4f}",
+        lambda: f"{rnd.uniform(1, 9):.2f}e-{rnd.randint(1, 5)}",
+        lambda: f"/dev/ttyS{rnd.randint(0, 9)}",
+        lambda: f"[[{rnd.randint(0, 9)},{rnd.randint(0, 9)}],[{rnd.randint(0, 9)},{rnd.randint(0, 9)}]]",
+    ]
+    weights = [45, 35, 5, 10, 5]
+    return [rnd.choices(makers, weights)[0]() for _ in range(count)]
+
+
+def timeit(func, repeat: int = 5) -> float:
+    """返回多次执行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_value_conversion(count: int = 50000):
+    """对比逐值转换与按列批量转换"""
+    converter = CSVToJSONConverter()
+    values = make_param_values(count)
+
+    scalar = [converter._convert_value(v) for v in values]
+    batched = converter._convert_values(values)
+    assert scalar == batched, "批量转换结果与逐值转换不一致"
+
+    scalar_time = timeit(lambda: [converter._convert_value(v) for v in values])
+    batched_time = timeit(lambda: converter._convert_values(values))
+    print(f"值类型转换 ({count} 个参数)")
+    print(f"  逐值转换: {scalar_time * 1000:.1f} ms")
+    print(f"  批量转换: {batched_time * 1000:.1f} ms  (加速 {scalar_time / batched_time:.2f}x)")
+
+
+def make_param_rows(count: int, seed: int = 0, described: bool = True) -> list:
+    """生成包含count个参数的单项目表格（参数平均分布在Sensor_Parameter和robot两组），described为False时参数解释栏为空"""
+    rows = [["Version", "Group", "Type", "Value", "参数解释", "Define"],
+            ["2537", "Sensor_Type", "雷达", "欢创PMA2", "", ""]]
+    for i, value in enumerate(make_param_values(count, seed)):
+        if i == 0:
+            group = "Sensor_Parameter"
+        elif i == count // 2:
+            group = "robot"
+        else:
+            group = ""
+        rows.append(["", group, f"参数{i}", value, f"(参数{i}说明)" if described else "", f"Param{i}"])
+    return rows
+
+
+def legacy_get_param_comment(param_key: str, descriptions: dict = None) -> str:
+    """改为配置驱动的流式写入之前的_get_param_comment（原样保留，每次调用都新建注释表）"""
+    # 优先使用从CSV参数解释栏收集的信息
+    if descriptions and param_key in descriptions:
+        description = descriptions[param_key]
+        return f"#{description}"
+
+    # 如果没有找到，使用预定义的注释
+    comments = {
+        "LaserSerialPort": "#laser 串口号",
+        "LaserBiasDist": "#laser 距离偏差(m)",
+        "LaserBiasAngle": "#laser 角度偏差(度)",
+        "LineLaserSerialPort": "#linelaser 串口号",
+        "LinelaserBias": "#linelaser x轴偏差(m)",
+        "LinelaserHeight": "#linelaser 安装高度(m)",
+        "LinelaserVisualRange": "#linelaser 可视距离(m)",
+        "ThirdTofPort": "#3dtof 设备端口",
+        "ThirdTofBiasDist": "#3dtof 距离偏差(m)",
+        "ThirdTofBiasHight": "#3dtof 安装高度(m)",
+        "ThirdTofBiasLeft": "#3dtof 安装左右偏差(m)",
+        "RgbPort": "#rgb 设备端口",
+        "robot_radius": "#机器人半径(m)",
+        "RobotRadius": "#机器人半径(m)"
+    }
+    return comments.get(param_key, "#参数")
+
+
+def legacy_yaml_content(sensor_params: dict, robot_params: dict, descriptions: dict = None) -> str:
+    """改为配置驱动的流式写入之前的_build_yaml_content（原样保留）：两个分组各一份循环，先收集所有行再拼接"""
+    yaml_content = []
+
+    if sensor_params:
+        yaml_content.append("sensor:")
+        for key, value in sensor_params.items():
+            comment = legacy_get_param_comment(key, descriptions)
+            if isinstance(value, list) and all(isinstance(item, list) for item in value):
+                # 处理二维数组格式
+                yaml_content.append(f"  {key}:           {comment}")
+                for item in value:
+                    yaml_content.append(f"    - {item}")
+            elif isinstance(value, str) and value.startswith('"') and value.endswith('"'):
+                yaml_content.append(f"  {key}: {value}           {comment}")
+            else:
+                yaml_content.append(f"  {key}: {value}           {comment}")
+
+    if robot_params:
+        if yaml_content:
+            yaml_content.append("")
+        yaml_content.append("robot:")
+        for key, value in robot_params.items():
+            comment = legacy_get_param_comment(key, descriptions)
+            if isinstance(value, list) and all(isinstance(item, list) for item in value):
+                # 处理二维数组格式
+                yaml_content.append(f"  {key}:           {comment}")
+                for item in value:
+                    yaml_content.append(f"    - {item}")
+            elif isinstance(value, str) and value.startswith('"') and value.endswith('"'):
+                yaml_content.append(f"  {key}: {value}           {comment}")
+            else:
+                yaml_content.append(f"  {key}: {value}           {comment}")
+
+    return "\n".join(yaml_content)
+
+
+def bench_yaml_writer(count: int = 50000):
+    """
+    对比改动前后生成并写入config.yaml的耗时：旧实现先拼接整个文档再经sink.write写入，
+    新实现按段落流式写入；参数解析在计时之外完成，两边使用同一份参数
+    """
+    converter = CSVToJSONConverter()
+    output_dir = tempfile.mkdtemp(prefix="yaml_bench_")
+    sink = DirectorySink(output_dir)
+    results = []
+    try:
+        for described in (True, False):
+            _, section_params, descriptions = converter.parse_project_block(
+                make_param_rows(count, described=described)[1:])
+
+            def legacy():
+                sink.write("config.yaml", legacy_yaml_content(section_params["sensor"], section_params["robot"],
+                                                              descriptions))
+
+            def streaming():
+                converter._generate_yaml_file(section_params, sink=sink, descriptions=descriptions)
+
+            legacy()
+            with open(sink.path_for("config.yaml"), encoding='utf-8') as f:
+                expected = f.read()
+            streaming()
+            with open(sink.path_for("config.yaml"), encoding='utf-8') as f:
+                assert f.read() == expected, "流式写入结果与旧实现不一致"
+
+            results.append(("有参数解释" if described else "无参数解释", timeit(legacy), timeit(streaming)))
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    print(f"YAML生成并写入config.yaml ({count} 个参数)")
+    for label, legacy_time, streaming_time in results:
+        print(f"  {label}: 旧实现 {legacy_time * 1000:.1f} ms，流式写入 {streaming_time * 1000:.1f} ms"
+              f"  (加速 {legacy_time / streaming_time:.2f}x)")
+
+
+def write_project_sheet(path: str, projects: int, params_per_project: int, seed: int = 0):
+    """生成包含projects个项目的表格，每个项目有传感器、通信和params_per_project个参数"""
+    values = make_param_values(projects * params_per_project, seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Version", "Group", "Type", "Value", "参数解释", "Define"])
+        for project in range(projects):
+            writer.writerow([str(10000 + project), "Sensor_Type", "雷达", "欢创PMA2", "", ""])
+            writer.writerow(["", "Trans", "大小核通信", "rpmsg", "", ""])
+            for i in range(params_per_project):
+                group = "Sensor_Parameter" if i == 0 else ("robot" if i == params_per_project // 2 else "")
+                writer.writerow(["", group, f"参数{i}", values[project * params_per_project + i],
+                                 f"(参数{i}说明)", f"Param{i}"])
+
+
+def convert_csv_in_process(converter: CSVToJSONConverter, csv_path: str) -> str:
+    """
+    与convert_csv_sharded完全相同的流程（整个文件作为一个分片，iter_projects逐个序列化项目再拼接），
+    只是在当前进程中执行，作为分片并行转换的对照
+    """
+    fragments = {}
+    for start, end in shard_ranges(csv_path, 1):
+        for project_id, chunk in iter_shard_chunks(converter, csv_path, start, end, "json"):
+            fragments[project_id] = chunk
+    if not fragments:
+        return "{}"
+    return "{\n" + ",\n".join(fragments.values()) + "\n}"
+
+
+def bench_sharded(projects: int = 4000, params_per_project: int = 50):
+    """
+    对比顺序转换与按Version块分片的多进程转换（进程数从1到CPU核数）
+
+    顺序转换走与子进程相同的iter_projects流程，不解析参数、不生成YAML，差异只来自进程池和分片
+    """
+    directory = tempfile.mkdtemp(prefix="shard_bench_")
+    csv_path = os.path.join(directory, "sheet.csv")
+    try:
+        write_project_sheet(csv_path, projects, params_per_project)
+        converter = CSVToJSONConverter(output_sink=MemorySink())
+        expected = converter.convert_csv_to_json(csv_path)
+        assert convert_csv_in_process(converter, csv_path) == expected, "顺序转换结果与convert_csv_to_json不一致"
+        sequential_time = timeit(lambda: convert_csv_in_process(converter, csv_path), 3)
+
+        cpu_count = os.cpu_count() or 1
+        job_counts = sorted({1, cpu_count} | {2 ** i for i in range(1, cpu_count.bit_length()) if 2 ** i < cpu_count})
+        results = []
+        for jobs in job_counts:
+            assert convert_csv_sharded(csv_path, jobs) == expected, "分片转换结果与顺序转换不一致"
+            results.append((jobs, timeit(lambda: convert_csv_sharded(csv_path, jobs), 3)))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(f"单个表格分片并行转换 ({projects} 个项目，{projects * (params_per_project + 2)} 行，{cpu_count} 核)")
+    print(f"  顺序转换: {sequential_time * 1000:.1f} ms")
+    for jobs, elapsed in results:
+        print(f"  {jobs} 个进程: {elapsed * 1000:.1f} ms  (加速 {sequential_time / elapsed:.2f}x)")
+
+
+def main():
+    """运行全部基准"""
+    bench_value_conversion()
+    bench_yaml_writer()
+    bench_sharded()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
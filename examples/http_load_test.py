@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP转换服务压测客户端
+使用保持连接的HTTP/1.1请求压测本地服务，输出吞吐量和延迟分位数
+"""
+
+import argparse
+import http.client
+import threading
+import time
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """计算已排序数据的分位数（最近秩法）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_client(host: str, port: int, path: str, body: bytes, count: int,
+               latencies: list, errors: list, lock: threading.Lock):
+    """单个客户端线程：复用一条连接发送count个请求"""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    local_latencies = []
+    local_errors = 0
+    try:
+        for _ in range(count):
+            start = time.perf_counter()
+            try:
+                connection.request("POST", path, body=body,
+                                   headers={"Content-Type": "text/csv; charset=utf-8"})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    local_errors += 1
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+    finally:
+        connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def main():
+    """
+    主函数
+    """
+    parser = argparse.ArgumentParser(description="HTTP转换服务压测客户端")
+    parser.add_argument("csv_file", help="作为请求体发送的CSV文件")
+    parser.add_argument("--host", default="127.0.0.1", help="服务地址")
+    parser.add_argument("--port", type=int, default=8765, help="服务端口")
+    parser.add_argument("--format", default="json", choices=["json", "yaml"], help="输出格式")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发连接数")
+    parser.add_argument("--requests", type=int, default=1000, help="请求总数")
+    args = parser.parse_args()
+
+    with open(args.csv_file, 'rb') as f:
+        body = f.read()
+
+    path = f"/convert?format={args.format}"
+    per_client = max(1, args.requests // args.concurrency)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    threads = [
+        threading.Thread(target=run_client,
+                         args=(args.host, args.port, path, body, per_client, latencies, errors, lock))
+        for _ in range(args.concurrency)
+    ]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"请求数: {len(latencies)}  失败: {sum(errors)}  并发: {args.concurrency}")
+    print(f"耗时: {elapsed:.2f} s  吞吐量: {len(latencies) / elapsed:.1f} req/s")
+    print("延迟: p50 {:.2f} ms  p90 {:.2f} ms  p99 {:.2f} ms  max {:.2f} ms".format(
+        percentile(latencies, 0.50) * 1000,
+        percentile(latencies, 0.90) * 1000,
+        percentile(latencies, 0.99) * 1000,
+        (latencies[-1] if latencies else 0.0) * 1000,
+    ))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -7,22 +7,339 @@ CSV到JSON转换工具 - PyQt图形界面版本
 
 import sys
 import os
+import csv
 import json
+import itertools
+import threading
 import pandas as pd
 from typing import Dict, Any, List, Optional
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
     QPushButton, QTableWidget, QTableWidgetItem, QFileDialog,
-    QMessageBox, QLabel, QComboBox, QLineEdit, QTextEdit,
+    QMessageBox, QLabel, QComboBox, QLineEdit, QPlainTextEdit,
     QSplitter, QGroupBox, QGridLayout, QHeaderView, QTabWidget,
-    QScrollArea, QFrame, QSizePolicy
+    QScrollArea, QFrame, QSizePolicy, QProgressDialog
 )
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtGui import QFont, QIcon, QColor
+from PyQt5.QtCore import Qt, pyqtSignal, QThread, QTimer, QFileSystemWatcher
+from PyQt5.QtGui import QFont, QIcon, QColor, QTextCursor
 
 # 添加src目录到路径
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 from csv_to_json_converter import CSVToJSONConverter
+from csv_index import CSVRowIndex
+from bulk_export import ExportCancelled, export_to_target
+
+
+# 表格每次渲染的行数，滚动到底部时再加载下一页
+PAGE_SIZE = 200
+# 尝试读取CSV的编码
+CSV_ENCODINGS = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig']
+# 始终显示的列数（Version、Group、Type、Value、参数解释、Define）
+FIXED_COLUMNS = 6
+# 预览最多显示的字符数，超出部分截断（可通过“复制全部”获取完整内容）
+PREVIEW_MAX_CHARS = 1000000
+# 预览每次事件循环追加的字符数
+PREVIEW_CHUNK_CHARS = 64 * 1024
+# 编辑表格后延迟刷新预览的毫秒数，连续编辑只刷新一次
+PREVIEW_DELAY_MS = 300
+# 配置文件修改后延迟重新加载的毫秒数，等待编辑器写完
+CONFIG_RELOAD_DELAY_MS = 200
+
+
+def _non_empty_columns(rows, column_count: int) -> List[int]:
+    """返回有数据的列（前FIXED_COLUMNS列始终保留）"""
+    has_data = set(range(min(FIXED_COLUMNS, column_count)))
+    for row in rows:
+        for col, value in enumerate(row):
+            if col not in has_data and value.strip() != "":
+                has_data.add(col)
+    return sorted(has_data)
+
+
+class PreviewRowSource:
+    """后台加载完成前使用的首页数据"""
+    
+    complete = False
+    
+    def __init__(self, rows: List[List[str]]):
+        self.rows = rows
+        
+    def row_count(self) -> int:
+        return len(self.rows)
+        
+    def column_count(self) -> int:
+        return max((len(row) for row in self.rows), default=0)
+        
+    def read_rows(self, start: int, stop: int) -> List[List[str]]:
+        return self.rows[start:stop]
+        
+    def non_empty_columns(self) -> List[int]:
+        return _non_empty_columns(self.rows, self.column_count())
+
+
+class DataFrameRowSource:
+    """整表读入内存的数据来源（Excel或非UTF-8编码的CSV）"""
+    
+    complete = True
+    
+    def __init__(self, data_frame: pd.DataFrame):
+        self.data_frame = data_frame
+        
+    def row_count(self) -> int:
+        return self.data_frame.shape[0]
+        
+    def column_count(self) -> int:
+        return self.data_frame.shape[1]
+        
+    def read_rows(self, start: int, stop: int) -> List[List[str]]:
+        block = self.data_frame.iloc[start:stop]
+        return [["" if pd.isna(value) else str(value) for value in row]
+                for row in block.itertuples(index=False, name=None)]
+        
+    def scan_columns(self):
+        """DataFrame已在内存中，无需预先扫描"""
+        pass
+        
+    def non_empty_columns(self) -> List[int]:
+        frame = self.data_frame
+        has_data = (frame.notna() & frame.astype(str).apply(lambda column: column.str.strip() != "")).any(axis=0)
+        return [col for col in range(frame.shape[1]) if col < FIXED_COLUMNS or bool(has_data.iloc[col])]
+
+
+class IndexedCSVRowSource:
+    """基于行偏移索引按需读取的CSV数据来源，不把整张表读入内存"""
+    
+    complete = True
+    
+    def __init__(self, index: CSVRowIndex):
+        self.index = index
+        self._column_count = 0
+        self._non_empty_cols = []
+        
+    def row_count(self) -> int:
+        return self.index.row_count
+        
+    def column_count(self) -> int:
+        return self._column_count
+        
+    def read_rows(self, start: int, stop: int) -> List[List[str]]:
+        return self.index.read_rows(start, stop)
+        
+    def scan_columns(self):
+        """分块解析整张表，统计列数和有数据的列（在后台线程中执行）"""
+        column_count = 0
+        has_data = set()
+        for start in range(0, self.row_count(), PAGE_SIZE * 50):
+            rows = self.read_rows(start, start + PAGE_SIZE * 50)
+            column_count = max(column_count, max((len(row) for row in rows), default=0))
+            has_data.update(_non_empty_columns(rows, column_count))
+        self._column_count = column_count
+        self._non_empty_cols = sorted(has_data | set(range(min(FIXED_COLUMNS, column_count))))
+        
+    def non_empty_columns(self) -> List[int]:
+        return self._non_empty_cols
+
+
+def collect_table_rows(rendered_rows: List[List[str]], row_source, original_cols: int) -> List[List[str]]:
+    """
+    合并表格数据：已渲染的行取编辑后的值，其余行直接从数据来源读取，每行补齐到original_cols列
+    
+    不访问界面控件，可以在后台线程中调用
+    """
+    data = [row_data + [""] * (original_cols - len(row_data)) for row_data in rendered_rows]
+    for start in range(len(rendered_rows), row_source.row_count(), PAGE_SIZE * 50):
+        for row_values in row_source.read_rows(start, start + PAGE_SIZE * 50):
+            data.append(list(row_values) + [""] * (original_cols - len(row_values)))
+    return data
+
+
+def read_first_page(file_path: str) -> PreviewRowSource:
+    """只读取CSV的第一页，用于立即显示"""
+    for encoding in CSV_ENCODINGS:
+        try:
+            with open(file_path, 'r', encoding=encoding, newline='') as f:
+                return PreviewRowSource(list(itertools.islice(csv.reader(f), PAGE_SIZE)))
+        except UnicodeDecodeError:
+            continue
+    raise ValueError("无法读取CSV文件，请检查文件编码")
+
+
+def open_row_source(file_path: str):
+    """
+    打开完整的数据来源并完成列扫描（耗时操作，在后台线程中调用）
+    
+    UTF-8编码的CSV使用行偏移索引按需读取，其余编码和Excel整表读入DataFrame
+    """
+    if file_path.endswith('.csv'):
+        try:
+            source = IndexedCSVRowSource(CSVRowIndex.load_or_build(file_path))
+            source.scan_columns()
+            return source
+        except UnicodeDecodeError:
+            pass
+        # 尝试不同编码读取CSV
+        for encoding in CSV_ENCODINGS[1:]:
+            try:
+                return DataFrameRowSource(pd.read_csv(file_path, encoding=encoding, header=None))
+            except UnicodeDecodeError:
+                continue
+        raise ValueError("无法读取CSV文件，请检查文件编码")
+    # Excel文件
+    return DataFrameRowSource(pd.read_excel(file_path, header=None))
+
+
+class SheetLoadWorker(QThread):
+    """后台加载线程：建立索引并解析剩余的行"""
+    
+    loaded = pyqtSignal(str, object)
+    failed = pyqtSignal(str, str)
+    
+    def __init__(self, file_path: str, parent=None):
+        super().__init__(parent)
+        self.file_path = file_path
+        
+    def run(self):
+        try:
+            self.loaded.emit(self.file_path, open_row_source(self.file_path))
+        except Exception as e:
+            self.failed.emit(self.file_path, str(e))
+
+
+class BulkExportWorker(QThread):
+    """后台批量导出线程：在表格数据的快照上把每个项目的JSON和YAML写入归档或目录"""
+    
+    progress = pyqtSignal(int, int)
+    exported = pyqtSignal(str, int)
+    failed = pyqtSignal(str, str)
+    cancelled = pyqtSignal(str)
+    
+    def __init__(self, converter: CSVToJSONConverter, rendered_rows: List[List[str]], row_source,
+                 original_cols: int, target: str, parent=None):
+        super().__init__(parent)
+        self.converter = converter
+        self.rendered_rows = rendered_rows
+        self.row_source = row_source
+        self.original_cols = original_cols
+        self.target = target
+        self.cancel_event = threading.Event()
+        
+    def cancel(self):
+        """请求取消，当前项目写完后停止"""
+        self.cancel_event.set()
+        
+    def run(self):
+        try:
+            rows = collect_table_rows(self.rendered_rows, self.row_source, self.original_cols)
+            blocks = self.converter.split_version_blocks(rows)
+            exported = export_to_target(blocks, self.target, self.converter,
+                                        self.progress.emit, self.cancel_event)
+            self.exported.emit(self.target, len(exported))
+        except ExportCancelled:
+            self.cancelled.emit(self.target)
+        except Exception as e:
+            self.failed.emit(self.target, str(e))
+
+
+class PreviewWorker(QThread):
+    """后台预览线程：在表格数据的快照上生成JSON和YAML文本"""
+    
+    # (数据序号, "json"/"yaml", 文本, 错误信息)
+    rendered = pyqtSignal(int, str, str, str)
+    
+    def __init__(self, converter: CSVToJSONConverter, rendered_rows: List[List[str]], row_source,
+                 original_cols: int, kinds: set, generation: int, parent=None):
+        super().__init__(parent)
+        self.converter = converter
+        self.rendered_rows = rendered_rows
+        self.row_source = row_source
+        self.original_cols = original_cols
+        self.kinds = kinds
+        self.generation = generation
+        
+    def run(self):
+        try:
+            rows = collect_table_rows(self.rendered_rows, self.row_source, self.original_cols)
+        except Exception as e:
+            for kind in self.kinds:
+                self.rendered.emit(self.generation, kind, "", str(e))
+            return
+        if "json" in self.kinds:
+            try:
+                data = self.converter.parse_rows_to_dict(rows, generate_yaml=False)
+                self.rendered.emit(self.generation, "json", json.dumps(data, indent=2, ensure_ascii=False), "")
+            except Exception as e:
+                self.rendered.emit(self.generation, "json", "", str(e))
+        if "yaml" in self.kinds:
+            try:
+                self.rendered.emit(self.generation, "yaml", self.converter.convert_rows_to_yaml(rows), "")
+            except Exception as e:
+                self.rendered.emit(self.generation, "yaml", "", str(e))
+
+
+class IncrementalPreview(QPlainTextEdit):
+    """只读预览框：长文本在事件循环中分块追加，超过PREVIEW_MAX_CHARS时截断，完整内容保存在full_text"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setFont(QFont("Consolas", 10))
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.full_text = ""
+        self._text = ""
+        self._position = 0
+        self._end = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._append_chunk)
+        
+    def show_message(self, message: str):
+        """显示提示信息（没有可复制的输出）"""
+        self._timer.stop()
+        self.full_text = ""
+        self.setPlainText(message)
+        
+    def show_text(self, text: str):
+        """开始显示输出文本，第一块立即显示，其余块在之后的事件循环中追加"""
+        self._timer.stop()
+        self.full_text = text
+        self._text = text
+        self._end = len(text)
+        if self._end > PREVIEW_MAX_CHARS:
+            # 在行边界处截断
+            cut = text.rfind("\n", 0, PREVIEW_MAX_CHARS)
+            self._end = cut if cut > 0 else PREVIEW_MAX_CHARS
+        self._position = 0
+        self.clear()
+        self._append_chunk()
+        if self._position < self._end:
+            self._timer.start()
+        
+    def _append_chunk(self):
+        """追加下一块，全部追加后写入截断提示"""
+        if self._position >= self._end:
+            self._timer.stop()
+            if self._end < len(self._text):
+                self._insert(f"\n\n... 预览已截断，省略 {len(self._text) - self._end} 个字符，"
+                             f"点击“复制全部”获取完整内容")
+            self._text = ""
+            return
+        stop = min(self._position + PREVIEW_CHUNK_CHARS, self._end)
+        if stop < self._end:
+            # 尽量在行边界处分块
+            newline = self._text.rfind("\n", self._position, stop)
+            if newline > self._position:
+                stop = newline + 1
+        self._insert(self._text[self._position:stop])
+        self._position = stop
+        if self._position >= self._end and not self._timer.isActive():
+            # 只有一块时直接完成
+            self._append_chunk()
+        
+    def _insert(self, text: str):
+        """在末尾插入文本，不移动可见位置"""
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
 
 
 class EditableTableWidget(QTableWidget):
@@ -40,9 +357,30 @@ class EditableTableWidget(QTableWidget):
         self.itemChanged.connect(self.on_item_changed)
         
     def set_config_data(self, config_data: Dict[str, Any]):
-        """设置配置数据，用于生成下拉选项"""
+        """设置配置数据，用于生成下拉选项；选项有变化时就地更新已创建的下拉框"""
+        old_rules = self.constraint_rules
         self.config_data = config_data
         self._setup_constraint_rules()
+        changed = {cell_type for cell_type, options in self.constraint_rules.items()
+                   if old_rules.get(cell_type) != options}
+        if old_rules and changed:
+            self.update_combo_options(changed)
+            
+    def update_combo_options(self, cell_types: set):
+        """只替换这些类型下拉框的选项列表，保留单元格当前的值，不触发数据改变信号"""
+        for row in range(self.rowCount()):
+            for col in range(self.columnCount()):
+                combo = self.cellWidget(row, col)
+                if not isinstance(combo, QComboBox) or combo.property("cell_type") not in cell_types:
+                    continue
+                value = combo.currentText()
+                combo.blockSignals(True)
+                try:
+                    combo.clear()
+                    combo.addItems(self.constraint_rules[combo.property("cell_type")])
+                    combo.setCurrentText(value)
+                finally:
+                    combo.blockSignals(False)
         
     def _setup_constraint_rules(self):
         """设置约束规则"""
@@ -59,6 +397,7 @@ class EditableTableWidget(QTableWidget):
         """为特定单元格设置约束"""
         if cell_type in self.constraint_rules:
             combo = QComboBox()
+            combo.setProperty("cell_type", cell_type)
             combo.addItems(self.constraint_rules[cell_type])
             combo.setEditable(True)
             combo.currentTextChanged.connect(self.on_combo_changed)
@@ -101,9 +440,31 @@ class CSVJsonConverterGUI(QMainWindow):
         # 获取当前脚本所在目录，构建配置文件的绝对路径
         current_dir = os.path.dirname(os.path.abspath(__file__))
         config_path = os.path.join(current_dir, "config", "mapping_config.json")
+        self.config_path = config_path
         self.converter = CSVToJSONConverter(config_path)
         self.current_file_path = None
-        self.data_frame = None
+        # 表格数据来源：首页预览、行偏移索引或DataFrame
+        self.row_source = None
+        self.column_mapping = []
+        self.load_worker = None
+        self.export_worker = None
+        # 预览在后台线程中生成；序号随表格数据的每次修改递增，基于旧数据的结果直接丢弃
+        self.preview_worker = None
+        self.preview_generation = 0
+        self.pending_preview_kinds = set()
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DELAY_MS)
+        self.preview_timer.timeout.connect(self.start_preview_worker)
+        # 监视配置文件，修改后只重新编译转换器和下拉选项，不重建表格
+        self.config_watcher = QFileSystemWatcher(self)
+        if os.path.exists(config_path):
+            self.config_watcher.addPath(config_path)
+        self.config_watcher.fileChanged.connect(self.on_config_file_changed)
+        self.config_reload_timer = QTimer(self)
+        self.config_reload_timer.setSingleShot(True)
+        self.config_reload_timer.setInterval(CONFIG_RELOAD_DELAY_MS)
+        self.config_reload_timer.timeout.connect(self.reload_config)
         
         self.init_ui()
         self.load_config()
@@ -168,6 +529,12 @@ class CSVJsonConverterGUI(QMainWindow):
         self.export_yaml_btn.setEnabled(False)
         toolbar_layout.addWidget(self.export_yaml_btn)
         
+        # 批量导出按钮
+        self.bulk_export_btn = QPushButton("批量导出")
+        self.bulk_export_btn.clicked.connect(self.bulk_export)
+        self.bulk_export_btn.setEnabled(False)
+        toolbar_layout.addWidget(self.bulk_export_btn)
+        
         # 添加弹性空间
         toolbar_layout.addStretch()
         
@@ -190,6 +557,8 @@ class CSVJsonConverterGUI(QMainWindow):
         # 创建可编辑表格
         self.data_table = EditableTableWidget()
         self.data_table.tableDataChanged.connect(self.on_data_changed)
+        # 滚动到底部时加载下一页
+        self.data_table.verticalScrollBar().valueChanged.connect(self.on_table_scrolled)
         data_layout.addWidget(self.data_table, 1)  # 设置拉伸因子为1，让表格占用剩余空间
         
         parent.addWidget(data_widget)
@@ -221,15 +590,18 @@ class CSVJsonConverterGUI(QMainWindow):
         json_preview_layout.addWidget(json_preview_label)
         
         # JSON预览文本框
-        self.json_preview = QTextEdit()
-        self.json_preview.setFont(QFont("Consolas", 10))
-        self.json_preview.setReadOnly(True)
+        self.json_preview = IncrementalPreview()
         json_preview_layout.addWidget(self.json_preview)
         
-        # JSON刷新预览按钮
+        # JSON刷新预览和复制按钮
+        json_button_layout = QHBoxLayout()
         json_refresh_btn = QPushButton("刷新JSON预览")
         json_refresh_btn.clicked.connect(self.refresh_json_preview)
-        json_preview_layout.addWidget(json_refresh_btn)
+        json_button_layout.addWidget(json_refresh_btn)
+        json_copy_btn = QPushButton("复制全部")
+        json_copy_btn.clicked.connect(lambda: self.copy_full_output(self.json_preview))
+        json_button_layout.addWidget(json_copy_btn)
+        json_preview_layout.addLayout(json_button_layout)
         
         tab_widget.addTab(json_preview_tab, "JSON预览")
         
@@ -243,15 +615,18 @@ class CSVJsonConverterGUI(QMainWindow):
         yaml_preview_layout.addWidget(yaml_preview_label)
         
         # YAML预览文本框
-        self.yaml_preview = QTextEdit()
-        self.yaml_preview.setFont(QFont("Consolas", 10))
-        self.yaml_preview.setReadOnly(True)
+        self.yaml_preview = IncrementalPreview()
         yaml_preview_layout.addWidget(self.yaml_preview)
         
-        # YAML刷新预览按钮
+        # YAML刷新预览和复制按钮
+        yaml_button_layout = QHBoxLayout()
         yaml_refresh_btn = QPushButton("刷新YAML预览")
         yaml_refresh_btn.clicked.connect(self.refresh_yaml_preview)
-        yaml_preview_layout.addWidget(yaml_refresh_btn)
+        yaml_button_layout.addWidget(yaml_refresh_btn)
+        yaml_copy_btn = QPushButton("复制全部")
+        yaml_copy_btn.clicked.connect(lambda: self.copy_full_output(self.yaml_preview))
+        yaml_button_layout.addWidget(yaml_copy_btn)
+        yaml_preview_layout.addLayout(yaml_button_layout)
         
         tab_widget.addTab(yaml_preview_tab, "YAML预览")
         
@@ -264,6 +639,29 @@ class CSVJsonConverterGUI(QMainWindow):
         except Exception as e:
             QMessageBox.warning(self, "警告", f"加载配置失败: {str(e)}")
             
+    def on_config_file_changed(self, path: str):
+        """配置文件被修改：等待写入完成后再重新加载"""
+        self.config_reload_timer.start()
+        
+    def reload_config(self):
+        """重新加载配置文件：更新转换器映射和下拉选项，表格内容保持不变"""
+        if self.config_path not in self.config_watcher.files() and os.path.exists(self.config_path):
+            # 编辑器以替换文件的方式保存时，原文件的监视会失效
+            self.config_watcher.addPath(self.config_path)
+        try:
+            with open(self.config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            # 文件不完整或格式错误时保留当前配置
+            self.statusBar().showMessage(f"配置文件未重新加载: {str(e)}")
+            return
+        
+        # 使用新的转换器，正在运行的预览和导出线程继续使用旧的转换器
+        self.converter = CSVToJSONConverter(self.config_path)
+        self.data_table.set_config_data(config)
+        self.on_data_changed()
+        self.statusBar().showMessage("配置已重新加载")
+        
     def import_file(self):
         """导入文件"""
         file_path, _ = QFileDialog.getOpenFileName(
@@ -281,57 +679,84 @@ class CSVJsonConverterGUI(QMainWindow):
                 QMessageBox.critical(self, "错误", f"导入文件失败: {str(e)}")
                 
     def load_file_data(self, file_path: str):
-        """加载文件数据"""
+        """
+        加载文件数据
+        
+        CSV先读取并显示第一页，剩余的行在后台线程中建立索引和解析；Excel整表读入
+        """
         try:
+            # 丢弃基于上一个文件的预览结果
+            self.preview_generation += 1
             if file_path.endswith('.csv'):
-                # 尝试不同编码读取CSV
-                encodings = ['utf-8', 'gbk', 'gb2312', 'utf-8-sig']
-                for encoding in encodings:
-                    try:
-                        self.data_frame = pd.read_csv(file_path, encoding=encoding, header=None)
-                        break
-                    except UnicodeDecodeError:
-                        continue
-                if self.data_frame is None:
-                    raise ValueError("无法读取CSV文件，请检查文件编码")
+                self.row_source = read_first_page(file_path)
             else:
                 # Excel文件
-                self.data_frame = pd.read_excel(file_path, header=None)
+                self.row_source = DataFrameRowSource(pd.read_excel(file_path, header=None))
                 
-            # 填充表格
+            # 填充表格，第一页渲染完成后生成预览
             self.populate_table()
+            self.on_data_changed()
             
-            # 启用按钮
-            self.save_btn.setEnabled(True)
-            self.export_json_btn.setEnabled(True)
-            self.export_yaml_btn.setEnabled(True)
+            # 完整数据加载完成后才允许保存和导出
+            self.set_export_enabled(self.row_source.complete)
+            if not self.row_source.complete:
+                self.start_background_load(file_path)
             
         except Exception as e:
             raise Exception(f"读取文件失败: {str(e)}")
             
-    def populate_table(self):
-        """填充表格数据"""
-        if self.data_frame is None:
+    def set_export_enabled(self, enabled: bool):
+        """启用或禁用保存和导出按钮"""
+        self.save_btn.setEnabled(enabled)
+        self.export_json_btn.setEnabled(enabled)
+        self.export_yaml_btn.setEnabled(enabled)
+        self.bulk_export_btn.setEnabled(enabled and self.export_worker is None)
+        
+    def start_background_load(self, file_path: str):
+        """在后台线程中加载完整数据"""
+        worker = SheetLoadWorker(file_path, self)
+        worker.loaded.connect(self.on_background_loaded)
+        worker.failed.connect(self.on_background_failed)
+        worker.finished.connect(worker.deleteLater)
+        self.load_worker = worker
+        worker.start()
+        
+    def on_background_loaded(self, file_path: str, source):
+        """后台加载完成：切换到完整数据来源"""
+        if self.load_worker is None or self.load_worker.file_path != file_path:
+            # 加载期间又导入了其他文件
+            return
+        self.load_worker = None
+        self.row_source = source
+        self._relayout_columns()
+        self.set_export_enabled(True)
+        # 之前的预览只基于第一页的数据来源，用完整数据重新生成
+        self.on_data_changed()
+        self.statusBar().showMessage(
+            f"文件加载完成: {os.path.basename(file_path)}（共{source.row_count()}行）")
+        
+    def on_background_failed(self, file_path: str, message: str):
+        """后台加载失败"""
+        if self.load_worker is None or self.load_worker.file_path != file_path:
             return
+        self.load_worker = None
+        QMessageBox.critical(self, "错误", f"读取文件失败: {message}")
             
-        rows, cols = self.data_frame.shape
-        
-        # 检测非空列（至少保留前6列）
-        non_empty_cols = []
-        for col in range(cols):
-            has_data = False
-            for row in range(rows):
-                value = self.data_frame.iloc[row, col]
-                if pd.notna(value) and str(value).strip() != "":
-                    has_data = True
-                    break
-            if has_data or col < 6:  # 保留前6列，即使为空
-                non_empty_cols.append(col)
+    def populate_table(self):
+        """填充表格数据（只渲染第一页，其余行滚动时按需加载）"""
+        if self.row_source is None:
+            return
         
-        display_cols = len(non_empty_cols)
+        self.data_table.setRowCount(0)
+        self._setup_columns(self.row_source.non_empty_columns())
+        self.fetch_more()
         
-        # 设置表格大小
-        self.data_table.setRowCount(rows)
+        # 调整列宽
+        self.data_table.resizeColumnsToContents()
+        
+    def _setup_columns(self, non_empty_cols: List[int]):
+        """设置显示列和表头"""
+        display_cols = len(non_empty_cols)
         self.data_table.setColumnCount(display_cols)
         
         # 设置表头（为前6列设置有意义的名称）
@@ -357,41 +782,74 @@ class CSVJsonConverterGUI(QMainWindow):
         # 存储列映射关系，用于后续数据获取
         self.column_mapping = non_empty_cols
         
-        # 填充数据（使用列映射）
-        for row in range(rows):
-            for display_col in range(display_cols):
-                original_col = non_empty_cols[display_col]
-                value = self.data_frame.iloc[row, original_col]
-                if pd.isna(value):
-                    value = ""
-                else:
-                    value = str(value)
-                
-                # 直接设置单元格值，不进行任何填充处理
-                self.data_table.set_cell_value(row, display_col, value)
-                
-                # 为特定列设置约束（基于原始列索引）
-                if original_col == 0 and row > 0:  # 版本号列（原始第0列）
-                    # 只有当单元格有值时才设置版本号约束
-                    cell_value = self.data_table.get_cell_value(row, display_col)
-                    if cell_value and cell_value.strip():
-                        self.data_table.setup_cell_constraints(row, display_col, '版本号')
-                elif original_col == 2 and row > 0:  # Type列（原始第2列）
-                    type_value = self.data_table.get_cell_value(row, display_col)
-                    if type_value in ['雷达', '线结构光', '3dToF', 'RGB']:
-                        # 传感器类型，为下一列（Value列）设置对应的型号下拉框
-                        # 需要找到Value列在显示列中的位置
-                        value_display_col = self._find_display_col_for_original(3, non_empty_cols)
-                        if value_display_col is not None:
-                            self.data_table.setup_cell_constraints(row, value_display_col, type_value)
-                    elif type_value == '大小核通信':
-                        # 通信类型，为下一列（Value列）设置通信方式下拉框
-                        value_display_col = self._find_display_col_for_original(3, non_empty_cols)
-                        if value_display_col is not None:
-                            self.data_table.setup_cell_constraints(row, value_display_col, '大小核通信')
-                        
-        # 调整列宽
+    def can_fetch_more(self) -> bool:
+        """是否还有未渲染的行"""
+        return self.row_source is not None and self.data_table.rowCount() < self.row_source.row_count()
+        
+    def fetch_more(self):
+        """渲染下一页"""
+        if not self.can_fetch_more():
+            return
+        start = self.data_table.rowCount()
+        rows = self.row_source.read_rows(start, start + PAGE_SIZE)
+        self.data_table.setRowCount(start + len(rows))
+        self._render_rows(start, rows)
+        
+    def on_table_scrolled(self, value: int):
+        """滚动接近底部时加载下一页"""
+        if value >= self.data_table.verticalScrollBar().maximum() - 10 and self.can_fetch_more():
+            self.fetch_more()
+            
+    def _relayout_columns(self):
+        """完整数据的列布局与首页不同时，保留已渲染行的内容并重新渲染"""
+        non_empty_cols = self.row_source.non_empty_columns()
+        if non_empty_cols == self.column_mapping:
+            return
+        fetched_rows = self._get_rendered_rows()
+        self.data_table.setRowCount(0)
+        self._setup_columns(non_empty_cols)
+        self.data_table.setRowCount(len(fetched_rows))
+        self._render_rows(0, fetched_rows)
         self.data_table.resizeColumnsToContents()
+        
+    def _render_rows(self, start: int, rows: List[List[str]]):
+        """把rows渲染到从start开始的表格行"""
+        non_empty_cols = self.column_mapping
+        display_cols = len(non_empty_cols)
+        value_display_col = self._find_display_col_for_original(3, non_empty_cols)
+        
+        # 渲染期间屏蔽表格信号，避免每个单元格都触发一次预览刷新
+        self.data_table.blockSignals(True)
+        try:
+            for offset, row_values in enumerate(rows):
+                row = start + offset
+                for display_col in range(display_cols):
+                    original_col = non_empty_cols[display_col]
+                    value = row_values[original_col] if original_col < len(row_values) else ""
+                    
+                    # 直接设置单元格值，不进行任何填充处理
+                    self.data_table.set_cell_value(row, display_col, value)
+                    
+                    # 为特定列设置约束（基于原始列索引）
+                    if original_col == 0 and row > 0:  # 版本号列（原始第0列）
+                        # 只有当单元格有值时才设置版本号约束
+                        cell_value = self.data_table.get_cell_value(row, display_col)
+                        if cell_value and cell_value.strip():
+                            self.data_table.setup_cell_constraints(row, display_col, '版本号')
+                            # 下拉框默认选中第一项，恢复单元格原值
+                            self.data_table.set_cell_value(row, display_col, cell_value)
+                    elif original_col == 2 and row > 0:  # Type列（原始第2列）
+                        type_value = self.data_table.get_cell_value(row, display_col)
+                        if type_value in ['雷达', '线结构光', '3dToF', 'RGB']:
+                            # 传感器类型，为Value列设置对应的型号下拉框
+                            if value_display_col is not None:
+                                self.data_table.setup_cell_constraints(row, value_display_col, type_value)
+                        elif type_value == '大小核通信':
+                            # 通信类型，为Value列设置通信方式下拉框
+                            if value_display_col is not None:
+                                self.data_table.setup_cell_constraints(row, value_display_col, '大小核通信')
+        finally:
+            self.data_table.blockSignals(False)
     
     def _find_display_col_for_original(self, original_col_index, non_empty_cols):
         """查找原始列索引在显示列中的位置"""
@@ -401,13 +859,16 @@ class CSVJsonConverterGUI(QMainWindow):
             return None
         
     def on_data_changed(self):
-        """数据改变事件"""
-        self.refresh_json_preview()
-        self.refresh_yaml_preview()
+        """数据改变事件：延迟刷新预览，连续编辑只生成一次"""
+        if self.row_source is None:
+            return
+        self.preview_generation += 1
+        self.pending_preview_kinds.update(("json", "yaml"))
+        self.preview_timer.start()
         
     def save_csv(self):
         """保存CSV文件"""
-        if self.data_frame is None:
+        if self.row_source is None:
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
@@ -425,42 +886,35 @@ class CSVJsonConverterGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"保存CSV文件失败: {str(e)}")
                 
-    def get_table_data(self) -> List[List[str]]:
-        """获取表格数据"""
-        # 如果有列映射信息，需要恢复到原始的完整列结构
-        if hasattr(self, 'column_mapping') and hasattr(self, 'data_frame'):
-            rows = self.data_table.rowCount()
-            original_cols = self.data_frame.shape[1]
+    def _get_rendered_rows(self) -> List[List[str]]:
+        """获取已渲染的行，按原始列位置排列"""
+        width = max(self.column_mapping, default=-1) + 1
+        data = []
+        for row in range(self.data_table.rowCount()):
+            row_data = [""] * width
             
-            # 创建完整的数据结构
-            data = []
-            for row in range(rows):
-                row_data = [""] * original_cols
-                
-                # 填充显示列的数据到对应的原始列位置
-                for display_col in range(self.data_table.columnCount()):
-                    original_col = self.column_mapping[display_col]
-                    value = self.data_table.get_cell_value(row, display_col)
-                    
-                    # 保存所有列的值
-                    row_data[original_col] = value
-                
-                data.append(row_data)
-            return data
-        else:
-            # 回退到原始处理方式
-            data = []
-            for row in range(self.data_table.rowCount()):
-                row_data = []
-                for col in range(self.data_table.columnCount()):
-                    value = self.data_table.get_cell_value(row, col)
-                    row_data.append(value)
-                data.append(row_data)
-            return data
+            # 填充显示列的数据到对应的原始列位置
+            for display_col in range(self.data_table.columnCount()):
+                original_col = self.column_mapping[display_col]
+                row_data[original_col] = self.data_table.get_cell_value(row, display_col)
+            
+            data.append(row_data)
+        return data
+        
+    def get_table_data(self) -> List[List[str]]:
+        """获取表格数据（已渲染的行取表格中编辑后的值，其余行直接从数据来源读取）"""
+        if self.row_source is None:
+            return []
+        
+        return collect_table_rows(self._get_rendered_rows(), self.row_source, self._original_column_count())
+        
+    def _original_column_count(self) -> int:
+        """原始的完整列数"""
+        return max(self.row_source.column_count(), max(self.column_mapping, default=-1) + 1)
         
     def export_json(self):
         """导出JSON文件"""
-        if self.data_frame is None:
+        if self.row_source is None:
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
@@ -490,7 +944,7 @@ class CSVJsonConverterGUI(QMainWindow):
                 
     def export_yaml(self):
         """导出YAML文件"""
-        if self.data_frame is None:
+        if self.row_source is None:
             return
             
         file_path, _ = QFileDialog.getSaveFileName(
@@ -518,58 +972,124 @@ class CSVJsonConverterGUI(QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"导出YAML文件失败: {str(e)}")
             
-    def refresh_json_preview(self):
-        """刷新JSON预览"""
-        if self.data_frame is None:
-            self.json_preview.setText("请先导入文件")
+    def bulk_export(self):
+        """把每个项目的JSON和YAML批量导出到zip归档或目录"""
+        if self.row_source is None or self.export_worker is not None:
             return
             
-        try:
-            # 创建临时CSV文件进行转换
-            temp_csv = "temp_preview.csv"
-            updated_data = self.get_table_data()
-            updated_df = pd.DataFrame(updated_data)
-            updated_df.to_csv(temp_csv, index=False, header=False, encoding='utf-8')
-            
-            # 转换为JSON
-            json_str = self.converter.convert_csv_to_json(temp_csv)
-            
-            # 删除临时文件
-            if os.path.exists(temp_csv):
-                os.remove(temp_csv)
-                
-            # 格式化JSON显示
-            json_obj = json.loads(json_str)
-            formatted_json = json.dumps(json_obj, indent=2, ensure_ascii=False)
-            self.json_preview.setText(formatted_json)
+        target, _ = QFileDialog.getSaveFileName(
+            self, "批量导出", "projects.zip", "ZIP归档 (*.zip);;目录（不带扩展名） (*)"
+        )
+        if not target:
+            return
+        
+        # 与预览相同：主线程只读取已渲染的行，未渲染的行由后台线程从数据来源读取
+        worker = BulkExportWorker(self.converter, self._get_rendered_rows(), self.row_source,
+                                  self._original_column_count(), target, self)
+        dialog = QProgressDialog("正在导出项目...", "取消", 0, 0, self)
+        dialog.setWindowTitle("批量导出")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(worker.cancel)
+        worker.progress.connect(lambda done, total: self.on_bulk_export_progress(dialog, done, total))
+        worker.exported.connect(self.on_bulk_exported)
+        worker.failed.connect(self.on_bulk_export_failed)
+        worker.cancelled.connect(self.on_bulk_export_cancelled)
+        worker.finished.connect(dialog.reset)
+        worker.finished.connect(self.on_bulk_export_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.export_worker = worker
+        self.bulk_export_btn.setEnabled(False)
+        worker.start()
+        
+    def on_bulk_export_progress(self, dialog: QProgressDialog, done: int, total: int):
+        """更新批量导出进度"""
+        if dialog.wasCanceled():
+            return
+        dialog.setMaximum(total)
+        dialog.setValue(done)
+        dialog.setLabelText(f"正在导出项目 {done}/{total}")
+        
+    def on_bulk_exported(self, target: str, count: int):
+        """批量导出完成"""
+        QMessageBox.information(self, "成功", f"已导出 {count} 个项目！")
+        self.statusBar().showMessage(f"已批量导出 {count} 个项目: {target}")
+        
+    def on_bulk_export_failed(self, target: str, message: str):
+        """批量导出失败"""
+        QMessageBox.critical(self, "错误", f"批量导出失败: {message}")
+        
+    def on_bulk_export_cancelled(self, target: str):
+        """批量导出已取消"""
+        self.statusBar().showMessage(f"批量导出已取消: {target}")
+        
+    def on_bulk_export_finished(self):
+        """批量导出线程结束"""
+        self.export_worker = None
+        self.bulk_export_btn.setEnabled(self.save_btn.isEnabled())
             
-        except Exception as e:
-            self.json_preview.setText(f"预览生成失败: {str(e)}")
+    def refresh_json_preview(self):
+        """刷新JSON预览"""
+        self.request_preview("json")
             
     def refresh_yaml_preview(self):
         """刷新YAML预览"""
-        if self.data_frame is None:
-            self.yaml_preview.setText("请先导入文件")
+        self.request_preview("yaml")
+        
+    def _preview_widget(self, kind: str) -> IncrementalPreview:
+        return self.json_preview if kind == "json" else self.yaml_preview
+        
+    def request_preview(self, kind: str):
+        """立即刷新一个预览；已有预览线程在运行时，等它结束后用最新数据再生成"""
+        if self.row_source is None:
+            self._preview_widget(kind).show_message("请先导入文件")
             return
+        self.pending_preview_kinds.add(kind)
+        self.preview_timer.stop()
+        self.start_preview_worker()
+        
+    def start_preview_worker(self):
+        """在当前表格数据的快照上启动预览线程"""
+        if self.preview_worker is not None or not self.pending_preview_kinds or self.row_source is None:
+            return
+        # 读取界面控件必须在主线程中完成，未渲染的行由后台线程从数据来源读取
+        worker = PreviewWorker(self.converter, self._get_rendered_rows(), self.row_source,
+                               self._original_column_count(), set(self.pending_preview_kinds),
+                               self.preview_generation, self)
+        self.pending_preview_kinds.clear()
+        worker.rendered.connect(self.on_preview_rendered)
+        worker.finished.connect(self.on_preview_finished)
+        worker.finished.connect(worker.deleteLater)
+        self.preview_worker = worker
+        self.statusBar().showMessage("正在生成预览...")
+        worker.start()
+        
+    def on_preview_rendered(self, generation: int, kind: str, text: str, error: str):
+        """预览生成完成：数据在生成期间又被修改时丢弃结果"""
+        if generation != self.preview_generation:
+            return
+        preview = self._preview_widget(kind)
+        if error:
+            label = "预览生成失败" if kind == "json" else "YAML预览生成失败"
+            preview.show_message(f"{label}: {error}")
+        else:
+            preview.show_text(text)
             
-        try:
-            # 创建临时CSV文件进行转换
-            temp_csv = "temp_yaml_preview.csv"
-            updated_data = self.get_table_data()
-            updated_df = pd.DataFrame(updated_data)
-            updated_df.to_csv(temp_csv, index=False, header=False, encoding='utf-8')
-            
-            # 转换为YAML (静默模式，不打印消息)
-            yaml_str = self.converter.convert_csv_to_yaml(temp_csv, silent=True)
-            
-            # 删除临时文件
-            if os.path.exists(temp_csv):
-                os.remove(temp_csv)
-                
-            self.yaml_preview.setText(yaml_str)
+    def on_preview_finished(self):
+        """预览线程结束，有新的刷新请求时继续生成"""
+        self.preview_worker = None
+        if self.statusBar().currentMessage() == "正在生成预览...":
+            self.statusBar().clearMessage()
+        if self.pending_preview_kinds and not self.preview_timer.isActive():
+            self.start_preview_worker()
             
-        except Exception as e:
-            self.yaml_preview.setText(f"YAML预览生成失败: {str(e)}")
+    def copy_full_output(self, preview: IncrementalPreview):
+        """把预览的完整输出（不受截断影响）复制到剪贴板"""
+        if not preview.full_text:
+            self.statusBar().showMessage("没有可复制的输出")
+            return
+        QApplication.clipboard().setText(preview.full_text)
+        self.statusBar().showMessage(f"已复制 {len(preview.full_text)} 个字符")
             
     def save_config(self):
         """保存配置"""
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV到JSON/YAML转换的asyncio接口
+把阻塞的文件读写和解析放到线程池中执行，避免阻塞事件循环
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import OutputSink
+
+
+class AsyncCSVToJSONConverter:
+    """CSVToJSONConverter的异步封装，支持并发上限和取消"""
+
+    def __init__(self, converter: Optional[CSVToJSONConverter] = None,
+                 max_concurrency: int = 4,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        """
+        初始化异步转换器
+
+        Args:
+            converter: 共享的转换器实例，默认按默认配置新建
+            max_concurrency: 同时在线程池中执行的转换数上限
+            executor: 自定义线程池，默认新建max_concurrency个线程的线程池
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency 必须大于0")
+        self.converter = converter or CSVToJSONConverter()
+        self.max_concurrency = max_concurrency
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="csv2json")
+        self._semaphore = None
+
+    async def aconvert_csv_to_json(self, csv_file_path: str, output_json_path: str = None,
+                                   sink: Optional[OutputSink] = None) -> Optional[str]:
+        """
+        convert_csv_to_json的异步版本
+        """
+        return await self._run(self.converter.convert_csv_to_json, csv_file_path, output_json_path, sink)
+
+    async def aconvert_csv_to_yaml(self, csv_file_path: str, output_yaml_path: str = None,
+                                   silent: bool = False, sink: Optional[OutputSink] = None) -> str:
+        """
+        convert_csv_to_yaml的异步版本
+        """
+        return await self._run(self.converter.convert_csv_to_yaml, csv_file_path, output_yaml_path,
+                               silent, sink)
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """
+        在线程池中执行阻塞调用
+
+        任务被取消时：尚未开始的调用直接撤销；已在执行的调用无法中断，
+        但其并发名额会保留到线程真正结束，保证线程池中的任务数不超过上限
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        await self._semaphore.acquire()
+
+        loop = asyncio.get_running_loop()
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._semaphore.release()
+            raise
+        future.add_done_callback(lambda _: self._release_from_thread(loop))
+        return await asyncio.wrap_future(future)
+
+    def _release_from_thread(self, loop: asyncio.AbstractEventLoop):
+        """线程中的调用结束后归还并发名额"""
+        try:
+            loop.call_soon_threadsafe(self._semaphore.release)
+        except RuntimeError:
+            # 事件循环已关闭，无需归还
+            pass
+
+    def close(self):
+        """关闭自建的线程池"""
+        if self._own_executor:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
+async def aconvert_csv_to_json(csv_file_path: str, output_json_path: str = None,
+                               config_file: str = "config/mapping_config.json") -> Optional[str]:
+    """
+    单次异步转换为JSON，需要并发上限时请复用AsyncCSVToJSONConverter
+    """
+    async with AsyncCSVToJSONConverter(CSVToJSONConverter(config_file), max_concurrency=1) as converter:
+        return await converter.aconvert_csv_to_json(csv_file_path, output_json_path)
+
+
+async def aconvert_csv_to_yaml(csv_file_path: str, output_yaml_path: str = None,
+                               config_file: str = "config/mapping_config.json",
+                               silent: bool = False) -> str:
+    """
+    单次异步转换为YAML，需要并发上限时请复用AsyncCSVToJSONConverter
+    """
+    async with AsyncCSVToJSONConverter(CSVToJSONConverter(config_file), max_concurrency=1) as converter:
+        return await converter.aconvert_csv_to_yaml(csv_file_path, output_yaml_path, silent)
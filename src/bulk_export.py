@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量导出表格中的全部项目
+一次解析，把每个项目的 <项目ID>/result.json 和 <项目ID>/config.yaml
+依次写入同一个zip/tar归档或目录，支持进度回调和取消；
+导出目标为.db/.sqlite时增量更新到SQLite项目库
+"""
+
+import argparse
+import os
+import sys
+import threading
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_index import CSVRowIndex
+from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import ArchiveSink, OutputSink, open_sink
+from project_store import ProjectStore, is_store_path
+
+# 块内容：已解析的行，或返回这些行的函数（用到时才读取）
+BlockRows = Union[List[List[str]], Callable[[], List[List[str]]]]
+
+
+class ExportCancelled(Exception):
+    """导出被取消"""
+    pass
+
+
+def _unique_blocks(blocks: Iterable[Tuple[str, BlockRows]]) -> List[Tuple[str, BlockRows]]:
+    """同一版本出现多次时以最后一次为准，顺序按第一次出现，与转换结果的字典一致"""
+    unique = {}
+    for version, rows in blocks:
+        unique[version] = rows
+    return list(unique.items())
+
+
+def export_projects(converter: CSVToJSONConverter, blocks: Iterable[Tuple[str, BlockRows]],
+                    sink: OutputSink,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    cancel_event: Optional[threading.Event] = None) -> List[str]:
+    """
+    逐个项目解析并写入输出目标，同一时刻只持有一个项目块
+
+    Args:
+        converter: 转换器
+        blocks: [(版本号, 块内的行)]
+        sink: 输出目标
+        progress: 进度回调 progress(已完成数, 总数)
+        cancel_event: 被设置后在下一个项目开始前抛出ExportCancelled
+
+    Returns:
+        已导出的项目ID
+    """
+    # 不在转换器versions筛选范围内的块不读取
+    blocks = _unique_blocks((version, rows) for version, rows in blocks if converter.selects_version(version))
+    exported = []
+    for done, (version, rows) in enumerate(blocks):
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled()
+        if progress:
+            progress(done, len(blocks))
+        project_id = converter.project_id(version)
+        converter.export_project(project_id, rows() if callable(rows) else rows, sink)
+        exported.append(project_id)
+    if progress:
+        progress(len(blocks), len(blocks))
+    return exported
+
+
+def csv_blocks(csv_path: str) -> List[Tuple[str, BlockRows]]:
+    """通过行偏移索引列出CSV中的项目块，块内容在导出到该项目时才读取"""
+    index = CSVRowIndex.load_or_build(csv_path)
+    return [(version, lambda start=start_row, stop=stop_row: index.read_rows(start, stop))
+            for version, start_row, stop_row in index.project_ranges()]
+
+
+def export_to_target(blocks: Iterable[Tuple[str, BlockRows]], target: str,
+                     converter: Optional[CSVToJSONConverter] = None,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     cancel_event: Optional[threading.Event] = None) -> List[str]:
+    """
+    导出到归档文件或目录，取消或失败时删除未完成的归档（目录中已写出的项目保留）
+
+    Args:
+        blocks: [(版本号, 块内的行)]，可由csv_blocks或转换器的split_version_blocks得到
+        target: .zip/.tar等归档路径，其余视为目录
+    """
+    converter = converter or CSVToJSONConverter()
+    sink = open_sink(target)
+    try:
+        with sink:
+            return export_projects(converter, blocks, sink, progress, cancel_event)
+    except BaseException:
+        if isinstance(sink, ArchiveSink) and os.path.exists(target):
+            os.remove(target)
+        raise
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """
+    主函数
+    
+    Args:
+        argv: 命令行参数，默认读取sys.argv
+        prog: 帮助信息中显示的程序名
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="把表格中每个项目的JSON和YAML批量导出到归档或目录")
+    parser.add_argument("csv_file", help="CSV文件")
+    parser.add_argument("-o", "--output", default="output/projects.zip",
+                        help="导出目标，.zip/.tar/.tar.gz等为归档，.db/.sqlite为项目库（增量更新），其余视为目录")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    parser.add_argument("--npy-threshold", type=int,
+                        help="二维数组元素数超过该值时写入.npy旁路文件（默认取配置文件中的npy_threshold）")
+    parser.add_argument("--quiet", action="store_true", help="不显示进度")
+    args = parser.parse_args(argv)
+
+    converter = CSVToJSONConverter(args.config, npy_threshold=args.npy_threshold)
+    if is_store_path(args.output):
+        with ProjectStore(args.output, converter) as store:
+            stats = store.upsert_sheet(args.csv_file)
+        print(f"新增 {stats['added']}，更新 {stats['updated']}，删除 {stats['removed']}，"
+              f"未变 {stats['unchanged']}: {args.output}")
+        return 0
+
+    def show_progress(done: int, total: int):
+        print(f"\r导出进度: {done}/{total}", end="", file=sys.stderr, flush=True)
+
+    try:
+        exported = export_to_target(csv_blocks(args.csv_file), args.output, converter,
+                                    None if args.quiet else show_progress)
+    except KeyboardInterrupt:
+        print("\n导出已取消", file=sys.stderr)
+        return 130
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"已导出 {len(exported)} 个项目: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
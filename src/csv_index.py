@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CSV行偏移索引
+通过内存映射扫描CSV，记录每一行的起始字节偏移和每个Version块的起始行，
+之后只需解析需要的字节范围；索引保存为旁路文件，CSV大小或修改时间变化时重建
+"""
+
+import csv
+import io
+import json
+import mmap
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class CSVRowIndex:
+    """CSV行偏移索引，行号与csv.reader读出的行一一对应（第0行为标题行）"""
+
+    SIDECAR_SUFFIX = ".rowidx"
+    FORMAT_VERSION = 1
+
+    def __init__(self, csv_path: str, row_offsets: array, version_blocks: List[Tuple[str, int]],
+                 size: int, mtime_ns: int):
+        """
+        Args:
+            csv_path: CSV文件路径
+            row_offsets: 每一行的起始字节偏移，末尾额外记录文件大小
+            version_blocks: [(版本号, 起始行号)]，按出现顺序排列
+            size: 建立索引时的文件大小
+            mtime_ns: 建立索引时的修改时间
+        """
+        self.csv_path = csv_path
+        self.row_offsets = row_offsets
+        self.version_blocks = version_blocks
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @property
+    def row_count(self) -> int:
+        """行数（含标题行）"""
+        return len(self.row_offsets) - 1
+
+    @classmethod
+    def sidecar_path(cls, csv_path: str) -> str:
+        """旁路索引文件路径"""
+        return csv_path + cls.SIDECAR_SUFFIX
+
+    @classmethod
+    def build(cls, csv_path: str) -> "CSVRowIndex":
+        """
+        扫描CSV建立索引
+
+        只在引号之外的换行处断行：逐段查找换行符，并用引号计数的奇偶判断换行是否位于引号内
+        """
+        stat = os.stat(csv_path)
+        offsets = array('q')
+        blocks = []
+        if stat.st_size == 0:
+            offsets.append(0)
+            return cls(csv_path, offsets, blocks, stat.st_size, stat.st_mtime_ns)
+
+        with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            row_start = 0
+            position = 0
+            in_quotes = False
+            while row_start < size:
+                newline = mm.find(b'\n', position)
+                end = size if newline == -1 else newline + 1
+                # 大部分行不含引号，只对含引号的行切片计数
+                if mm.find(b'"', position, end) != -1 and mm[position:end].count(b'"') % 2:
+                    in_quotes = not in_quotes
+                position = end
+                if in_quotes and newline != -1:
+                    # 换行位于引号内，继续查找本行的结尾
+                    continue
+                offsets.append(row_start)
+                row_number = len(offsets) - 1
+                if row_number > 0:
+                    version = cls._first_field(mm, row_start, end)
+                    if version:
+                        blocks.append((version, row_number))
+                row_start = end
+                in_quotes = False
+            offsets.append(size)
+
+        return cls(csv_path, offsets, blocks, stat.st_size, stat.st_mtime_ns)
+
+    @staticmethod
+    def _first_field(mm: mmap.mmap, start: int, end: int) -> str:
+        """读取一行的第一列（Version列）"""
+        first = mm[start:start + 1]
+        if first in (b',', b'\n', b'\r', b''):
+            return ""
+        if first != b'"':
+            comma = mm.find(b',', start, end)
+            field_end = end if comma == -1 else comma
+            return mm[start:field_end].decode('utf-8-sig').rstrip('\r\n')
+        # 带引号的字段交给csv模块解析
+        row = next(csv.reader(io.StringIO(mm[start:end].decode('utf-8-sig'), newline=None)), [])
+        return row[0] if row else ""
+
+    @classmethod
+    def load(cls, csv_path: str) -> Optional["CSVRowIndex"]:
+        """读取旁路索引，不存在、格式不符或已过期时返回None"""
+        sidecar = cls.sidecar_path(csv_path)
+        try:
+            stat = os.stat(csv_path)
+            with open(sidecar, 'rb') as f:
+                header = json.loads(f.readline().decode('utf-8'))
+                if (header.get("format") != cls.FORMAT_VERSION
+                        or header.get("size") != stat.st_size
+                        or header.get("mtime_ns") != stat.st_mtime_ns):
+                    return None
+                offsets = array('q')
+                offsets.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        if len(offsets) != header.get("rows", -1) + 1:
+            return None
+        blocks = [(version, row) for version, row in header.get("blocks", [])]
+        return cls(csv_path, offsets, blocks, stat.st_size, stat.st_mtime_ns)
+
+    def save(self):
+        """写入旁路索引（先写临时文件再替换）"""
+        sidecar = self.sidecar_path(self.csv_path)
+        header = {
+            "format": self.FORMAT_VERSION,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "rows": self.row_count,
+            "blocks": self.version_blocks,
+        }
+        temp_path = f"{sidecar}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(json.dumps(header, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.write(self.row_offsets.tobytes())
+        os.replace(temp_path, sidecar)
+
+    @classmethod
+    def load_or_build(cls, csv_path: str, persist: bool = True) -> "CSVRowIndex":
+        """优先使用有效的旁路索引，否则重建（并按需保存）"""
+        index = cls.load(csv_path)
+        if index is None:
+            index = cls.build(csv_path)
+            if persist:
+                try:
+                    index.save()
+                except OSError:
+                    # 目录只读时仍可使用内存中的索引
+                    pass
+        return index
+
+    def byte_range(self, start_row: int, stop_row: int) -> Tuple[int, int]:
+        """行范围[start_row, stop_row)对应的字节范围"""
+        stop_row = min(stop_row, self.row_count)
+        start_row = min(max(start_row, 0), stop_row)
+        return self.row_offsets[start_row], self.row_offsets[stop_row]
+
+    def read_rows(self, start_row: int, stop_row: int) -> List[List[str]]:
+        """只读取并解析行范围[start_row, stop_row)"""
+        start, end = self.byte_range(start_row, stop_row)
+        if end <= start:
+            return []
+        with open(self.csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode('utf-8-sig' if start == 0 else 'utf-8')
+        # 与按文本模式打开文件一致，统一换行符
+        return list(csv.reader(io.StringIO(text, newline=None)))
+
+    def block_ranges(self) -> List[Tuple[str, int, int]]:
+        """每个Version块的[(版本号, 起始行, 结束行)]"""
+        ranges = []
+        for i, (version, start_row) in enumerate(self.version_blocks):
+            if i + 1 < len(self.version_blocks):
+                stop_row = self.version_blocks[i + 1][1]
+            else:
+                stop_row = self.row_count
+            ranges.append((version, start_row, stop_row))
+        return ranges
+
+    def project_ranges(self) -> List[Tuple[str, int, int]]:
+        """
+        与转换器拆分项目块的规则一致的[(版本号, 起始行, 结束行)]
+
+        第一个版本号之前的数据行归入"unknown"块，没有任何数据行时返回空的"unknown"块
+        """
+        ranges = self.block_ranges()
+        first_row = ranges[0][1] if ranges else self.row_count
+        if first_row > 1 or not ranges:
+            ranges.insert(0, ("unknown", min(1, self.row_count), first_row))
+        return ranges
+
+    def block_map(self) -> Dict[str, Tuple[int, int]]:
+        """版本号到行范围的映射，同一版本出现多次时以最后一次为准"""
+        return {version: (start_row, stop_row) for version, start_row, stop_row in self.block_ranges()}
+
+    def read_block(self, version: str) -> List[List[str]]:
+        """读取标题行和指定版本块的全部行，版本不存在时抛出KeyError"""
+        start_row, stop_row = self.block_map()[version]
+        return self.read_rows(0, 1) + self.read_rows(start_row, stop_row)
@@ -5,25 +5,213 @@ CSV到JSON转换脚本
 将编译选项CSV文件转换为指定的JSON格式
 """
 
+import contextlib
 import csv
+import functools
+import hashlib
+import io
+import itertools
 import json
+import logging
 import os
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from csv_index import CSVRowIndex
+from output_sinks import OutputSink, DirectorySink, TeeSink
+from output_validator import OutputValidator, raise_for_issues
+from spill import SpillTable
+
+# 转换器的诊断信息（警告等）经logging输出到标准错误，不会混入写到标准输出的转换结果
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy为可选依赖，只有启用.npy旁路文件时才需要
+    np = None
+
+# 值类型转换使用的预编译模式（仅匹配ASCII数字，其余写法交给逐值转换兜底）
+_FLOAT_PATTERN = re.compile(
+    r'[+-]?(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?'
+    r'|[+-]?[0-9]+[eE][+-]?[0-9]+'
+)
+_NUMBER_PATTERN = re.compile(
+    r'(?P<int>[+-]?[0-9]+)|(?P<float>' + _FLOAT_PATTERN.pattern + r')'
+)
+
+
+def _reject_constant(name: str):
+    """JSON中的NaN/Infinity在eval下不是合法数组，交给逐值转换处理"""
+    raise ValueError(name)
+
+
+# 二维数组的快速解析器，解析失败时回退到eval
+_decode_array = json.JSONDecoder(parse_constant=_reject_constant).decode
+
+# 流式写入YAML时每次写入的行数
+_YAML_CHUNK_LINES = 1024
+
+# 参数解释中的换行（连同两侧空白），写成注释时折叠为一个空格
+_LINE_BREAKS = re.compile(r"\s*[\r\n]+\s*")
+
+# .npy旁路文件名 <段落>.<参数名>.npy 中段落和参数名允许的字符，其余（路径分隔符、空白、冒号等）不能用作文件名
+_SIDECAR_NAME_PART = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.\-]*")
+
+# 参数分组到YAML段落的默认映射，配置文件未声明parameter_groups时使用
+DEFAULT_PARAMETER_GROUPS = {
+    "Sensor_Parameter": {"section": "sensor", "skip_values": ["无"]},
+    "robot": {"section": "robot"}
+}
+
+# 其余分组的默认处理器，配置文件未声明group_handlers时使用
+DEFAULT_GROUP_HANDLERS = {
+    "Sensor_Type": {"handler": "sensor_type"},
+    "Trans": {"handler": "mapping", "target": "comm"}
+}
+
+# 参数注释的默认语言，其余语言中缺少的条目取该语言的注释
+DEFAULT_COMMENT_LOCALE = "zh"
+
+# 参数解释栏为空时使用的注释，按语言区分，配置文件未声明param_comments时使用
+DEFAULT_PARAM_COMMENTS = {
+    "zh": {
+        "default": "参数",
+        "params": {
+            "LaserSerialPort": "laser 串口号",
+            "LaserBiasDist": "laser 距离偏差(m)",
+            "LaserBiasAngle": "laser 角度偏差(度)",
+            "LineLaserSerialPort": "linelaser 串口号",
+            "LinelaserBias": "linelaser x轴偏差(m)",
+            "LinelaserHeight": "linelaser 安装高度(m)",
+            "LinelaserVisualRange": "linelaser 可视距离(m)",
+            "ThirdTofPort": "3dtof 设备端口",
+            "ThirdTofBiasDist": "3dtof 距离偏差(m)",
+            "ThirdTofBiasHight": "3dtof 安装高度(m)",
+            "ThirdTofBiasLeft": "3dtof 安装左右偏差(m)",
+            "RgbPort": "rgb 设备端口",
+            "robot_radius": "机器人半径(m)",
+            "RobotRadius": "机器人半径(m)"
+        }
+    }
+}
+
+
+class ProjectBlockState:
+    """解析单个Version块时各分组处理器共享的状态"""
+    
+    __slots__ = ("project_data", "section_items", "descriptions")
+    
+    def __init__(self, project_data: Dict[str, Any], section_items: Dict[str, List[tuple]]):
+        self.project_data = project_data
+        # YAML段落 -> [(Define, 原始值)]，块解析完成后批量转换类型
+        self.section_items = section_items
+        # 参数解释信息，用于生成注释
+        self.descriptions: Dict[str, str] = {}
+    
+    def add_param(self, section: str, define: str, value: str, description: Optional[str] = None):
+        """收集一个参数的Define、原始值和参数解释"""
+        self.section_items[section].append((define, value))
+        if description is not None:
+            self.descriptions[define] = description
+
+
+class SpillingBlockState(ProjectBlockState):
+    """
+    内存有上限的块状态：参数连同参数解释写入SpillTable（分组为YAML段落）；table为None时不收集参数
+    """
+    
+    __slots__ = ("table",)
+    
+    def __init__(self, project_data: Dict[str, Any], table: Optional[SpillTable]):
+        super().__init__(project_data, {})
+        self.table = table
+    
+    def add_param(self, section: str, define: str, value: str, description: Optional[str] = None):
+        if self.table is not None:
+            self.table.append(section, define, value, description)
+
 
 class CSVToJSONConverter:
-    def __init__(self, config_file: str = "config/mapping_config.json"):
+    def __init__(self, config_file: str = "config/mapping_config.json",
+                 output_sink: Optional[OutputSink] = None,
+                 npy_threshold: Optional[int] = None,
+                 memory_limit: Optional[int] = None,
+                 comment_locale: Optional[str] = None,
+                 versions: Optional[Iterable[str]] = None,
+                 groups: Optional[Iterable[str]] = None,
+                 validate: bool = False):
         """
         初始化转换器
         
         Args:
             config_file: 映射配置文件路径
+            output_sink: 默认的输出目标（默认写入output目录）
+            npy_threshold: 二维数组元素数超过该值时保存为NumPy数组，YAML中引用.npy旁路文件；
+                           默认取配置文件中的npy_threshold，为None时不启用
+            memory_limit: 流式转换时内存中累积数据的上限（字节），超过后转存到临时磁盘；
+                          默认取配置文件中的memory_limit，为None时不限制
+            comment_locale: 参数注释的语言（如zh、en），默认取配置文件中的comment_locale
+            versions: 只解析这些版本号的项目块，其余块在拆分时直接跳过；为None时不筛选
+            groups: 只解析这些分组的行，其余分组的行不做类型转换、名称规范化和参数解释收集；
+                    为None时不筛选
+            validate: 输出时逐个校验项目和YAML参数；各转换方法的issues参数为None时，
+                      本次调用有问题则在结束时抛出OutputValidationError，传入列表时问题追加到其中
         """
         self.config_file = config_file
+        self.output_sink = output_sink or DirectorySink("output")
         self.config = self.load_config()
         
+        self.npy_threshold = npy_threshold if npy_threshold is not None else self.config.get("npy_threshold")
+        if self.npy_threshold is not None and np is None:
+            logger.warning("警告: 未安装NumPy，数组参数将直接写入YAML")
+            self.npy_threshold = None
+        self.memory_limit = memory_limit if memory_limit is not None else self.config.get("memory_limit")
+        
+        # 解析范围的筛选，在拆分项目块和查找分组处理器时生效
+        self.selected_versions = frozenset(versions) if versions is not None else None
+        self.selected_groups = frozenset(groups) if groups is not None else None
+        
+        # 配置（及分组筛选）的摘要：项目结构只由它们决定，增量更新时据此判断已有结果是否过期
+        digest_source = json.dumps([self.config, sorted(self.selected_groups or ())],
+                                   sort_keys=True, ensure_ascii=False, default=str)
+        self.config_digest = hashlib.blake2b(digest_source.encode('utf-8'), digest_size=16).hexdigest()
+        
         # 从配置文件构建映射表
         self.chinese_to_english_map = {}
         self._build_mapping_from_config()
+        
+        # 分组 -> (处理器类型, 选项)；分组 -> 绑定好选项的处理函数，逐行解析时按分组名直接查表
+        self.group_handlers = {}
+        self._group_dispatch = {}
+        # YAML段落，按配置中的声明顺序输出
+        self.yaml_sections = []
+        self._build_group_handlers()
+        if self.selected_groups is not None:
+            for group in sorted(self.selected_groups - self.group_handlers.keys()):
+                logger.warning(f"警告: 分组 {group} 未在配置中注册，将被忽略")
+        
+        # 参数名 -> 注释（已带#），加载配置时编译一次
+        self.comment_locale = comment_locale or self.config.get("comment_locale", DEFAULT_COMMENT_LOCALE)
+        self.param_comments = {}
+        self.default_comment = "#参数"
+        self._build_param_comments()
+        
+        # 输出校验器，由配置编译一次；问题按调用收集，不保存在转换器上
+        self.validator = OutputValidator(self) if validate else None
+    
+    @contextlib.contextmanager
+    def _collect_issues(self, issues: Optional[List[str]]) -> Iterator[Optional[List[str]]]:
+        """
+        一次调用使用的问题列表：未启用校验时为None；调用方传入列表时问题追加到其中，
+        否则使用本次调用自己的列表，调用正常结束时有问题则抛出OutputValidationError
+        """
+        if self.validator is None or issues is not None:
+            yield issues
+            return
+        collected = []
+        yield collected
+        raise_for_issues(collected)
     
     def load_config(self) -> Dict[str, Any]:
         """
@@ -33,10 +221,10 @@ class CSVToJSONConverter:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except FileNotFoundError:
-            print(f"警告: 配置文件 {self.config_file} 不存在，使用默认配置")
+            logger.warning(f"警告: 配置文件 {self.config_file} 不存在，使用默认配置")
             return self._get_default_config()
         except json.JSONDecodeError as e:
-            print(f"错误: 配置文件格式错误 - {e}")
+            logger.error(f"错误: 配置文件格式错误 - {e}")
             return self._get_default_config()
     
     def _get_default_config(self) -> Dict[str, Any]:
@@ -73,7 +261,10 @@ class CSVToJSONConverter:
                 "无": None,
                 "": None
             },
-            "project_prefix": "project_"
+            "project_prefix": "project_",
+            "group_handlers": DEFAULT_GROUP_HANDLERS,
+            "parameter_groups": DEFAULT_PARAMETER_GROUPS,
+            "param_comments": DEFAULT_PARAM_COMMENTS
         }
     
     def _build_mapping_from_config(self):
@@ -99,6 +290,132 @@ class CSVToJSONConverter:
             "rpmsg": "ipc"
         })
     
+    def _build_group_handlers(self):
+        """
+        从配置文件的group_handlers和parameter_groups注册分组处理器
+        """
+        declared = list(self.config.get("group_handlers", DEFAULT_GROUP_HANDLERS).items())
+        declared += [(group, {"handler": "parameters", **spec})
+                     for group, spec in self.config.get("parameter_groups", DEFAULT_PARAMETER_GROUPS).items()]
+        for group, spec in declared:
+            options = dict(spec)
+            handler = options.pop("handler", None)
+            try:
+                self.register_group(group, handler, **options)
+            except ValueError as e:
+                logger.warning(f"警告: 忽略分组 {group} - {e}")
+    
+    def _build_param_comments(self):
+        """
+        从配置文件的param_comments编译参数注释表：默认语言打底，再用所选语言覆盖
+        """
+        catalog = self.config.get("param_comments", DEFAULT_PARAM_COMMENTS)
+        if self.comment_locale not in catalog:
+            logger.warning(f"警告: 配置中没有 {self.comment_locale} 语言的参数注释，使用 {DEFAULT_COMMENT_LOCALE}")
+        comments = {}
+        default = "参数"
+        for locale in (DEFAULT_COMMENT_LOCALE, self.comment_locale):
+            entry = catalog.get(locale, {})
+            comments.update(entry.get("params", {}))
+            default = entry.get("default", default)
+        self.param_comments = {key: f"#{text}" for key, text in comments.items()}
+        self.default_comment = f"#{default}"
+    
+    def _iter_comments(self, keys: Iterable[str], descriptions: Optional[Dict[str, str]] = None) -> Iterator[str]:
+        """
+        依次产出各参数的注释，CSV参数解释栏的信息优先，其次是注释表
+        
+        逐个参数查两个字典，不为每次转换合并出新字典
+        """
+        get_param_comment = self.param_comments.get
+        default = self.default_comment
+        if not descriptions:
+            return map(get_param_comment, keys, itertools.repeat(default))
+        return (f"#{descriptions[key]}" if key in descriptions else get_param_comment(key, default)
+                for key in keys)
+    
+    @classmethod
+    def register_handler_type(cls, name: str, handler: Callable):
+        """
+        注册一种分组处理器类型，之后可在配置文件或register_group中按名称引用
+        
+        Args:
+            name: 处理器类型名称
+            handler: 处理函数 handler(converter, state, row, options)，
+                     state为ProjectBlockState，row至少包含4列，options为分组声明中的其余选项
+        """
+        # 复制一份，避免修改父类的注册表
+        cls.GROUP_HANDLER_TYPES = {**cls.GROUP_HANDLER_TYPES, name: handler}
+    
+    def register_group(self, group: str, handler: str, **options):
+        """
+        为表格中的分组注册处理器，同名分组会被覆盖
+        
+        Args:
+            group: 表格Group列中的分组名
+            handler: 处理器类型名称，内置 sensor_type、mapping、parameters
+            **options: 处理器选项，如mapping的target，parameters的section和skip_values
+        
+        设置了groups筛选时，不在范围内的分组只记录配置，不参与解析，也不产生YAML段落
+        """
+        func = self.GROUP_HANDLER_TYPES.get(handler)
+        if func is None:
+            raise ValueError(f"未知的分组处理器类型: {handler}")
+        selected = self.selected_groups is None or group in self.selected_groups
+        if handler == "parameters":
+            options["section"] = options.get("section", group)
+            options["skip_values"] = frozenset(options.get("skip_values", []))
+            if selected and options["section"] not in self.yaml_sections:
+                self.yaml_sections.append(options["section"])
+        self.group_handlers[group] = (handler, options)
+        if selected:
+            self._group_dispatch[group] = functools.partial(func, self, options=options)
+        else:
+            self._group_dispatch.pop(group, None)
+    
+    def _handle_sensor_type(self, state: ProjectBlockState, row: List[str], options: Dict[str, Any]):
+        """
+        处理传感器类型数据：Type为传感器类型，Value为型号
+        """
+        type_name, value = row[2], row[3]
+        if not type_name:
+            return
+        sensors = state.project_data["sensor"]
+        # 根据type_name确定传感器类型
+        sensor_key = self.chinese_to_english_map.get(type_name)
+        if sensor_key and sensor_key in sensors:
+            if value and value != "无":
+                sensors[sensor_key] = self.normalize_sensor_name(type_name, value)
+            else:
+                sensors[sensor_key] = None
+    
+    def _handle_mapping(self, state: ProjectBlockState, row: List[str], options: Dict[str, Any]):
+        """
+        处理映射数据（如通信）：Type和Value经映射表转换后写入项目结构的target字段
+        """
+        type_name, value = row[2], row[3]
+        if type_name and value:
+            key = self.chinese_to_english_map.get(type_name)
+            if key:
+                target = state.project_data.setdefault(options.get("target", "comm"), {})
+                target[key] = self.chinese_to_english_map.get(value, value)
+    
+    def _handle_parameters(self, state: ProjectBlockState, row: List[str], options: Dict[str, Any]):
+        """
+        处理参数数据（需要Define列），收集到对应的YAML段落
+        """
+        if len(row) > 5:
+            define, value = row[5], row[3]
+            if define and value and value not in options["skip_values"]:
+                state.add_param(options["section"], define, value, self._row_description(row))
+    
+    # 内置的分组处理器类型
+    GROUP_HANDLER_TYPES: Dict[str, Callable] = {
+        "sensor_type": _handle_sensor_type,
+        "mapping": _handle_mapping,
+        "parameters": _handle_parameters,
+    }
+    
     def normalize_sensor_name(self, sensor_type: str, model: str) -> Optional[str]:
         """
         根据传感器类型和型号生成标准化名称
@@ -126,104 +443,298 @@ class CSVToJSONConverter:
         model_normalized = model.lower().replace(" ", "_").replace("-", "_")
         return f"{model_normalized}_{sensor_type_en}"
     
-    def parse_csv_to_dict(self, csv_file_path: str) -> Dict[str, Any]:
+    def parse_csv_to_dict(self, csv_file_path: str, sink: Optional[OutputSink] = None,
+                          version: Optional[str] = None, issues: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         解析CSV文件并转换为字典结构
+        
+        Args:
+            csv_file_path: CSV文件路径
+            sink: config.yaml的输出目标，默认使用self.output_sink
+            version: 只解析指定版本的项目，借助行偏移索引只读取该Version块
+            issues: 启用校验时本次调用的问题列表，见__init__的validate
+        """
+        if version is not None:
+            rows = CSVRowIndex.load_or_build(csv_file_path).read_block(version)
+        elif self.selected_versions is not None:
+            rows = list(self.iter_selected_rows(CSVRowIndex.load_or_build(csv_file_path)))
+        else:
+            with open(csv_file_path, 'r', encoding='utf-8') as file:
+                rows = list(csv.reader(file))
+        
+        return self.parse_rows_to_dict(rows, sink=sink, issues=issues)
+    
+    def parse_rows_to_dict(self, rows: List[List[str]], generate_yaml: bool = True,
+                           sink: Optional[OutputSink] = None,
+                           issues: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        解析已读入内存的CSV行并转换为字典结构，每个Version块生成一个项目
+        
+        Args:
+            rows: csv.reader读出的行（含标题行）
+            generate_yaml: 是否同时生成config.yaml（取第一个项目的参数）
+            sink: config.yaml的输出目标，默认使用self.output_sink
+            issues: 启用校验时本次调用的问题列表，见__init__的validate
         """
         result = {}
         
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            rows = list(csv_reader)
-            
-            if not rows:
-                return result
-            
-            # 获取项目版本作为项目ID
-            project_version = rows[1][0] if len(rows) > 1 and rows[1][0] else "unknown"
-            project_prefix = self.config.get("project_prefix", "project_")
-            project_id = f"{project_prefix}{project_version}"
-            
-            # 初始化项目结构
-            project_data = {
-                "sensor": {
-                    "lidar": None,
-                    "linelaser": None,
-                    "threedtof": None,
-                    "rgb": None
-                },
-                "comm": {},
-                "body": {}
-            }
+        if not rows:
+            return result
+        
+        yaml_params = None
+        
+        with self._collect_issues(issues) as issues:
+            for project_version, block_rows in self.split_version_blocks(rows):
+                project_data, section_params, descriptions = self.parse_project_block(block_rows)
+                # 获取项目版本作为项目ID
+                project_id = self.project_id(project_version)
+                if self.validator is not None:
+                    self.validator.check_project(project_id, project_data, issues)
+                result[project_id] = project_data
+                if yaml_params is None:
+                    yaml_params = (section_params, descriptions)
             
-            sensor_params = {}
-            robot_params = {}
-            # 存储参数解释信息，用于生成注释
-            self.param_descriptions = {}
+            # 生成YAML文件（筛选后可能没有任何项目）
+            if yaml_params is not None:
+                section_params, descriptions = yaml_params
+                if generate_yaml and any(section_params.values()):
+                    self._generate_yaml_file(section_params, sink=sink, descriptions=descriptions, issues=issues)
+        
+        return result
+    
+    def project_id(self, version: str) -> str:
+        """
+        根据版本号生成项目ID
+        """
+        return f"{self.config.get('project_prefix', 'project_')}{version}"
+    
+    def selects_version(self, version: str) -> bool:
+        """
+        版本号是否在versions筛选范围内，未设置筛选时总是True
+        """
+        return self.selected_versions is None or version in self.selected_versions
+    
+    def iter_selected_rows(self, index: CSVRowIndex) -> Iterator[List[str]]:
+        """
+        借助行偏移索引逐块产出标题行和versions筛选范围内的项目块，其余块不读取
+        """
+        yield from index.read_rows(0, 1)
+        for version, start_row, stop_row in index.project_ranges():
+            if self.selects_version(version):
+                yield from index.read_rows(start_row, stop_row)
+    
+    def split_version_blocks(self, rows: List[List[str]]) -> List[tuple]:
+        """
+        按Version列把数据行拆分为项目块，返回[(版本号, 块内的行)]
+        
+        Version列不为空的行开始一个新块；第一个版本号之前的行归入"unknown"块。
+        设置了versions筛选时只返回范围内的块，没有匹配的块时返回空列表
+        """
+        return list(self.iter_version_blocks(rows))
+    
+    def iter_version_blocks(self, rows: Iterable[List[str]]) -> Iterator[tuple]:
+        """
+        split_version_blocks的流式版本：逐行读取（第一行为标题行），
+        遇到下一个版本号或输入结束时立即产出上一个块，适合处理管道中陆续到达的数据
+        """
+        rows = iter(rows)
+        next(rows, None)  # 跳过标题行
+        current = None
+        # 不在筛选范围内的块，其行直接丢弃
+        skipping = not self.selects_version("unknown")
+        empty = True
+        for row in rows:
+            empty = False
+            if row and row[0]:
+                if current is not None:
+                    yield current
+                skipping = not self.selects_version(row[0])
+                current = None if skipping else (row[0], [row])
+            elif current is not None:
+                current[1].append(row)
+            elif not skipping:
+                current = ("unknown", [row])
+        
+        if current is not None:
+            yield current
+        elif empty and not skipping:
+            yield "unknown", []
+    
+    def iter_block_streams(self, rows: Iterable[List[str]]) -> Iterator[tuple]:
+        """
+        iter_version_blocks的惰性版本：块内的行也以迭代器产出，不在内存中组装整个块
+        
+        取下一个块之前，当前块中未读完的行会被跳过；不在versions筛选范围内的块不产出，其行直接跳过
+        """
+        rows = iter(rows)
+        next(rows, None)  # 跳过标题行
+        lookahead = [next(rows, None)]
+        if lookahead[0] is None:
+            if self.selects_version("unknown"):
+                yield "unknown", iter(())
+            return
+        
+        def block_rows():
+            row = lookahead[0]
+            lookahead[0] = None
+            yield row
+            for row in rows:
+                if row and row[0]:
+                    lookahead[0] = row
+                    return
+                yield row
+        
+        while lookahead[0] is not None:
+            first_row = lookahead[0]
+            block = block_rows()
+            version = first_row[0] if first_row and first_row[0] else "unknown"
+            if self.selects_version(version):
+                yield version, block
+            for _ in block:
+                pass
+    
+    def iter_projects(self, rows: Iterable[List[str]], issues: Optional[List[str]] = None) -> Iterator[tuple]:
+        """
+        逐个产出 (项目ID, 项目结构)，不收集参数，内存占用与输入大小无关
+        
+        同一版本出现多次时会产出多次；空输入不产出任何项目，与convert_csv_to_json一致。
+        issues为启用校验时本次调用的问题列表，为None时全部产出后有问题才抛出OutputValidationError
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            return
+        with self._collect_issues(issues) as issues:
+            for version, block_rows in self.iter_block_streams(itertools.chain((header,), rows)):
+                state = SpillingBlockState(self._new_project_data(), None)
+                self._feed_block(state, block_rows)
+                project_id = self.project_id(version)
+                if self.validator is not None:
+                    self.validator.check_project(project_id, state.project_data, issues)
+                yield project_id, state.project_data
+    
+    @staticmethod
+    def serialize_project(project_id: str, project_data: Dict[str, Any]) -> str:
+        """
+        序列化单个项目，与json.dumps(整个结果, indent=4, ensure_ascii=False)中对应的片段完全一致
+        """
+        value = json.dumps(project_data, indent=4, ensure_ascii=False).replace("\n", "\n    ")
+        return f"    {json.dumps(project_id, ensure_ascii=False)}: {value}"
+    
+    def write_rows_to_json(self, rows: Iterable[List[str]], out: TextIO, generate_yaml: bool = True,
+                           sink: Optional[OutputSink] = None, issues: Optional[List[str]] = None) -> int:
+        """
+        流式转换为JSON并写入文本流，输出与convert_csv_to_json一致，返回项目数
+        
+        逐行读取，块内的行不在内存中组装；已完成的项目和第一个项目的参数（用于config.yaml）
+        超过memory_limit的一半后分别转存到临时磁盘，写出时再依次读回，峰值内存与输入大小无关
+        
+        Args:
+            rows: csv.reader读出的行（含标题行），可以是逐行产出的迭代器
+            out: JSON写入的文本流
+            generate_yaml: 是否同时生成config.yaml（取第一个项目的参数）
+            sink: config.yaml的输出目标，默认使用self.output_sink
+            issues: 启用校验时本次调用的问题列表，为None时写完后有问题才抛出OutputValidationError
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            out.write("{}")
+            return 0
+        
+        limit = self.memory_limit // 2 if self.memory_limit is not None else None
+        with self._collect_issues(issues) as issues, SpillTable(limit) as projects, SpillTable(limit) as params:
+            blocks = self.iter_block_streams(itertools.chain((header,), rows))
+            for index, (version, block_rows) in enumerate(blocks):
+                # 只有第一个项目的参数用于生成YAML
+                state = SpillingBlockState(self._new_project_data(), params if index == 0 else None)
+                self._feed_block(state, block_rows)
+                project_id = self.project_id(version)
+                if self.validator is not None:
+                    self.validator.check_project(project_id, state.project_data, issues)
+                projects.append("", project_id, self.serialize_project(project_id, state.project_data))
             
-            # 解析CSV数据
-            current_group = None
-            for row in rows[1:]:  # 跳过标题行
-                if len(row) < 4:
-                    continue
-                    
-                version, group, type_name, value = row[0], row[1], row[2], row[3]
-                
-                # 如果group不为空，更新当前组
-                if group:
-                    current_group = group
-                
-                # 处理传感器类型数据
-                if current_group == "Sensor_Type" and type_name:
-                    # 根据type_name确定传感器类型
-                    sensor_key = self.chinese_to_english_map.get(type_name)
-                    if sensor_key and sensor_key in project_data["sensor"]:
-                        if value and value != "无":
-                            normalized_name = self.normalize_sensor_name(type_name, value)
-                            project_data["sensor"][sensor_key] = normalized_name
-                        else:
-                            project_data["sensor"][sensor_key] = None
-                        
-                # 处理通信数据
-                elif current_group == "Trans" and type_name and value:
-                    comm_key = self.chinese_to_english_map.get(type_name)
-                    if comm_key:
-                        comm_value = self.chinese_to_english_map.get(value, value)
-                        project_data["comm"][comm_key] = comm_value
-                
-                # 处理传感器参数（如果有Define列的话）
-                elif current_group == "Sensor_Parameter" and len(row) > 5:
-                    define = row[5] if len(row) > 5 else None
-                    if define and value and value != "无":
-                        sensor_params[define] = self._convert_value(value)
-                        # 收集参数解释信息作为注释（Meaning列是第5列，索引4）
-                        if len(row) > 4 and row[4]:  # Meaning列在第5列（索引4）
-                            description = row[4].strip()
-                            # 去掉最外面的括号
-                            if description.startswith('(') and description.endswith(')'):
-                                description = description[1:-1]
-                            self.param_descriptions[define] = description
-                
-                # 处理机器人参数
-                elif current_group == "robot" and len(row) > 5:
-                    define = row[5] if len(row) > 5 else None
-                    if define and value:
-                        robot_params[define] = self._convert_value(value)
-                        # 收集参数解释信息作为注释（Meaning列是第5列，索引4）
-                        if len(row) > 4 and row[4]:  # Meaning列在第5列（索引4）
-                            description = row[4].strip()
-                            # 去掉最外面的括号
-                            if description.startswith('(') and description.endswith(')'):
-                                description = description[1:-1]
-                            self.param_descriptions[define] = description
+            count = 0
+            for _, fragment, _ in projects.iter_unique(""):
+                out.write(",\n" if count else "{\n")
+                out.write(fragment)
+                count += 1
+            out.write("\n}" if count else "{}")
             
-            # 生成YAML文件
-            if sensor_params or robot_params:
-                self._generate_yaml_file(sensor_params, robot_params)
+            if generate_yaml and len(params):
+                sink = sink or self.output_sink
+                sections = ((section, self._iter_spilled_entries(params, section))
+                            for section in self.yaml_sections)
+                with sink.open("config.yaml") as stream:
+                    self._write_yaml_entries(stream, sections, sink, issues=issues)
+        return count
+    
+    def parse_project_block(self, block_rows: Iterable[List[str]]) -> tuple:
+        """
+        解析一个Version块
+        
+        Returns:
+            (项目结构, {YAML段落: 参数}, 参数解释)，段落按配置中的声明顺序排列
+        """
+        # 先收集参数的Define和原始值，循环结束后按列批量转换类型
+        # 状态每次调用独立，转换器实例可在多线程间共享
+        state = ProjectBlockState(self._new_project_data(), {section: [] for section in self.yaml_sections})
+        self._feed_block(state, block_rows)
+        
+        section_params = {section: self._convert_param_items(items)
+                          for section, items in state.section_items.items()}
+        
+        return state.project_data, section_params, state.descriptions
+    
+    def _new_project_data(self) -> Dict[str, Any]:
+        """
+        初始化项目结构
+        """
+        return {
+            "sensor": {
+                "lidar": None,
+                "linelaser": None,
+                "threedtof": None,
+                "rgb": None
+            },
+            "comm": {},
+            "body": {}
+        }
+    
+    def _feed_block(self, state: ProjectBlockState, block_rows: Iterable[List[str]]):
+        """
+        把一个Version块的行依次交给分组处理器
+        """
+        dispatch = self._group_dispatch
+        
+        # 解析CSV数据：Group列不为空时切换当前分组的处理器，未注册的分组忽略
+        handler = None
+        for row in block_rows:
+            if len(row) < 4:
+                continue
             
-            result[project_id] = project_data
+            group = row[1]
+            if group:
+                handler = dispatch.get(group)
             
-        return result
+            if handler is not None:
+                handler(state, row)
+    
+    def _row_description(self, row: List[str]) -> Optional[str]:
+        """
+        读取参数解释信息作为注释（Meaning列是第5列，索引4），为空时返回None
+        
+        单元格中的换行折叠为空格：注释只能占一行，否则后续行会成为YAML中的裸文本
+        """
+        if len(row) > 4 and row[4]:
+            description = row[4].strip()
+            if "\n" in description or "\r" in description:
+                description = _LINE_BREAKS.sub(" ", description)
+            # 去掉最外面的括号
+            if description.startswith('(') and description.endswith(')'):
+                description = description[1:-1]
+            return description
+        return None
     
     def _convert_value(self, value: str):
         """
@@ -240,8 +751,8 @@ class CSVToJSONConverter:
                 pass
         
         try:
-            # 尝试转换为浮点数
-            if '.' in value:
+            # 尝试转换为浮点数（包括科学计数法，如1e-3）
+            if '.' in value or _FLOAT_PATTERN.fullmatch(value):
                 return float(value)
             # 尝试转换为整数
             return int(value)
@@ -249,89 +760,259 @@ class CSVToJSONConverter:
             # 保持字符串
             return value
     
-    def _generate_yaml_file(self, sensor_params: Dict, robot_params: Dict, silent: bool = False):
+    def _convert_values(self, values: List[str]) -> List[Any]:
         """
-        生成YAML配置文件
+        批量转换一列值的类型，结果与逐个调用_convert_value完全一致
+        
+        先用一次预编译模式匹配为整列生成整数/浮点数掩码，二维数组用JSON解析代替eval，
+        只有可能被int()/float()接受的非常规写法才回退到_convert_value
         """
-        yaml_content = []
+        kinds = [match.lastgroup if match else None
+                 for match in map(_NUMBER_PATTERN.fullmatch, values)]
         
-        if sensor_params:
-            yaml_content.append("sensor:")
-            for key, value in sensor_params.items():
-                comment = self._get_param_comment(key)
-                if isinstance(value, list) and all(isinstance(item, list) for item in value):
-                    # 处理二维数组格式
-                    yaml_content.append(f"  {key}:           {comment}")
-                    for item in value:
-                        yaml_content.append(f"    - {item}")
-                elif isinstance(value, str) and value.startswith('"') and value.endswith('"'):
-                    yaml_content.append(f"  {key}: {value}           {comment}")
-                else:
-                    yaml_content.append(f"  {key}: {value}           {comment}")
-        
-        if robot_params:
-            if yaml_content:
-                yaml_content.append("")
-            yaml_content.append("robot:")
-            for key, value in robot_params.items():
-                comment = self._get_param_comment(key)
-                if isinstance(value, list) and all(isinstance(item, list) for item in value):
-                    # 处理二维数组格式
-                    yaml_content.append(f"  {key}:           {comment}")
-                    for item in value:
-                        yaml_content.append(f"    - {item}")
-                elif isinstance(value, str) and value.startswith('"') and value.endswith('"'):
-                    yaml_content.append(f"  {key}: {value}           {comment}")
-                else:
-                    yaml_content.append(f"  {key}: {value}           {comment}")
+        converted = []
+        append = converted.append
+        for value, kind in zip(values, kinds):
+            if kind == "int":
+                append(int(value))
+            elif kind == "float":
+                append(float(value))
+            elif value.startswith('[[') and value.endswith(']]'):
+                try:
+                    parsed_array = _decode_array(value)
+                    if all(isinstance(item, list) for item in parsed_array):
+                        append(parsed_array)
+                        continue
+                except ValueError:
+                    pass
+                append(self._convert_value(value))
+            elif '.' in value or value.strip().lstrip('+-').replace('_', '').isdecimal():
+                # 带空白、下划线等写法仍可能是数字，交给逐值转换
+                append(self._convert_value(value))
+            else:
+                # int()无法接受的字符串，保持原值
+                append(value)
+        return converted
+    
+    def _convert_param_items(self, items: List[tuple]) -> Dict[str, Any]:
+        """
+        将收集到的(Define, 原始值)列表批量转换为参数字典
+        """
+        if not items:
+            return {}
+        defines = [define for define, _ in items]
+        values = self._convert_param_values([value for _, value in items])
+        return dict(zip(defines, values))
+    
+    def _convert_param_values(self, values: List[str]) -> List[Any]:
+        """
+        批量转换参数值，启用npy_threshold时大数组转换为NumPy数组
+        """
+        values = self._convert_values(values)
+        if self.npy_threshold is not None:
+            values = [self._to_ndarray(value) if isinstance(value, list) else value for value in values]
+        return values
+    
+    def _to_ndarray(self, value: List[list]) -> Any:
+        """
+        元素数超过npy_threshold的数值二维数组转换为NumPy数组，其余（含不规则、非数值数组）保持列表
+        """
+        if sum(len(item) for item in value) <= self.npy_threshold:
+            return value
+        try:
+            array = np.asarray(value)
+        except ValueError:
+            return value
+        if array.ndim != 2 or array.dtype.kind not in "biuf":
+            return value
+        return array
+    
+    def _write_npy(self, sink: OutputSink, name: str, array: Any):
+        """把NumPy数组以.npy格式写入输出目标"""
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        sink.write_bytes(name, buffer.getvalue())
+    
+    def _write_yaml_sections(self, stream: TextIO, section_params: Dict[str, Dict],
+                             descriptions: Optional[Dict[str, str]] = None,
+                             array_sink: Optional[OutputSink] = None, array_dir: str = "",
+                             issues: Optional[List[str]] = None):
+        """
+        按段落顺序一次性把参数写入文本流，空段落跳过，段落之间空一行，末尾不带换行
         
-        # 确保输出目录存在
-        os.makedirs("output", exist_ok=True)
+        Args:
+            stream: 输出的文本流
+            section_params: {YAML段落: 参数}
+            descriptions: 从CSV参数解释栏收集的注释
+            array_sink: NumPy数组参数的.npy旁路文件写入的输出目标，不支持二进制时数组直接写入YAML
+            array_dir: 旁路文件在输出目标中的目录（即YAML文件所在目录），YAML中引用相对路径
+            issues: 启用校验时参数问题追加到的列表，为None时不校验
+        """
+        sections = ((section, zip(params, params.values(), self._iter_comments(params, descriptions)))
+                    for section, params in section_params.items())
+        self._write_yaml_entries(stream, sections, array_sink, array_dir, issues)
+    
+    def _write_yaml_entries(self, stream: TextIO, sections: Iterable[Tuple[str, Iterable[tuple]]],
+                            array_sink: Optional[OutputSink] = None, array_dir: str = "",
+                            issues: Optional[List[str]] = None):
+        """
+        _write_yaml_sections的通用版本，每个段落的参数为依次产出的 (参数名, 值, 注释)
+        """
+        if array_sink is not None and not array_sink.supports_binary:
+            array_sink = None
+        ndarray = np.ndarray if np is not None else ()
+        containers = (list, ndarray)
+        check = self.validator.check_param if self.validator is not None and issues is not None else None
+        location = f"{array_dir}/config.yaml" if array_dir else "config.yaml"
+        # 行先攒成固定大小的块再写入，减少对文本流的调用次数，内存占用与参数总数无关
+        chunk = []
+        append = chunk.append
+        first = True
+        for section, entries in sections:
+            entries = iter(entries)
+            first_entry = next(entries, None)
+            if first_entry is None:
+                continue
+            append(f"{section}:" if first else f"\n\n{section}:")
+            first = False
+            for key, value, comment in itertools.chain((first_entry,), entries):
+                if not isinstance(value, containers):
+                    # 标量参数（绝大多数）只做一次类型判断
+                    if check is not None:
+                        check(location, section, key, value, comment, issues)
+                    append(f"\n  {key}: {value}           {comment}")
+                else:
+                    if check is not None:
+                        check(location, section, key, value, comment, issues)
+                    if isinstance(value, ndarray):
+                        file_name = self._sidecar_name(section, key) if array_sink is not None else None
+                        if file_name is not None:
+                            # 大数组写入旁路文件，YAML中只保留引用
+                            self._write_npy(array_sink, f"{array_dir}/{file_name}" if array_dir else file_name,
+                                            value)
+                            append(f"\n  {key}: {{npy: {file_name}, shape: {list(value.shape)}}}           {comment}")
+                            continue
+                        value = value.tolist()
+                    if all(isinstance(item, list) for item in value):
+                        # 处理二维数组格式
+                        append(f"\n  {key}:           {comment}")
+                        chunk.extend([f"\n    - {item}" for item in value])
+                    else:
+                        append(f"\n  {key}: {value}           {comment}")
+                if len(chunk) >= _YAML_CHUNK_LINES:
+                    stream.write("".join(chunk))
+                    chunk.clear()
+        if chunk:
+            stream.write("".join(chunk))
+    
+    def _iter_spilled_entries(self, table: SpillTable, section: str) -> Iterator[tuple]:
+        """
+        从SpillTable中按批读出一个段落的参数并转换类型，产出 (参数名, 值, 注释)
+        """
+        batch = []
+        for item in table.iter_unique(section):
+            batch.append(item)
+            if len(batch) >= _YAML_CHUNK_LINES:
+                yield from self._convert_spilled_batch(batch)
+                batch = []
+        yield from self._convert_spilled_batch(batch)
+    
+    def _convert_spilled_batch(self, batch: List[tuple]) -> Iterator[tuple]:
+        """转换一批 (参数名, 原始值, 参数解释)"""
+        values = self._convert_param_values([value for _, value, _ in batch])
+        get_comment = self.param_comments.get
+        default = self.default_comment
+        for (key, _, description), value in zip(batch, values):
+            yield key, value, f"#{description}" if description is not None else get_comment(key, default)
+    
+    def _build_yaml_content(self, section_params: Dict[str, Dict],
+                            descriptions: Optional[Dict[str, str]] = None,
+                            array_sink: Optional[OutputSink] = None,
+                            issues: Optional[List[str]] = None) -> str:
+        """
+        生成YAML配置内容
         
-        # 写入YAML文件
-        with open("output/config.yaml", 'w', encoding='utf-8') as f:
-            f.write("\n".join(yaml_content))
+        Args:
+            section_params: {YAML段落: 参数}
+            descriptions: 从CSV参数解释栏收集的注释
+            array_sink: .npy旁路文件的输出目标，为空时数组直接写入YAML
+            issues: 启用校验时参数问题追加到的列表，为None时不校验
+        """
+        buffer = io.StringIO()
+        self._write_yaml_sections(buffer, section_params, descriptions, array_sink, issues=issues)
+        return buffer.getvalue()
+    
+    def _generate_yaml_file(self, section_params: Dict[str, Dict], silent: bool = False,
+                            sink: Optional[OutputSink] = None,
+                            descriptions: Optional[Dict[str, str]] = None,
+                            issues: Optional[List[str]] = None):
+        """
+        生成YAML配置文件，直接流式写入输出目标的config.yaml（.npy旁路文件写在同一目录）
+        """
+        sink = sink or self.output_sink
+        with sink.open("config.yaml") as stream:
+            self._write_yaml_sections(stream, section_params, descriptions, sink, issues=issues)
         
         # if not silent:
-            # print(f"YAML配置文件已生成: output/config.yaml")
-    
-    def _get_param_comment(self, param_key: str) -> str:
-        """
-        获取参数的注释
-        """
-        # 优先使用从CSV参数解释栏收集的信息
-        if hasattr(self, 'param_descriptions') and param_key in self.param_descriptions:
-            description = self.param_descriptions[param_key]
-            return f"#{description}"
-        
-        # 如果没有找到，使用预定义的注释
-        comments = {
-            "LaserSerialPort": "#laser 串口号",
-            "LaserBiasDist": "#laser 距离偏差(m)",
-            "LaserBiasAngle": "#laser 角度偏差(度)",
-            "LineLaserSerialPort": "#linelaser 串口号",
-            "LinelaserBias": "#linelaser x轴偏差(m)",
-            "LinelaserHeight": "#linelaser 安装高度(m)",
-            "LinelaserVisualRange": "#linelaser 可视距离(m)",
-            "ThirdTofPort": "#3dtof 设备端口",
-            "ThirdTofBiasDist": "#3dtof 距离偏差(m)",
-            "ThirdTofBiasHight": "#3dtof 安装高度(m)",
-            "ThirdTofBiasLeft": "#3dtof 安装左右偏差(m)",
-            "RgbPort": "#rgb 设备端口",
-            "robot_radius": "#机器人半径(m)",
-            "RobotRadius": "#机器人半径(m)"
-        }
-        return comments.get(param_key, "#参数")
+            # print(f"YAML配置文件已生成: config.yaml")
+    
+    def export_project(self, project_id: str, block_rows: List[List[str]], sink: OutputSink,
+                       issues: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        解析一个Version块，把该项目的 <项目ID>/result.json 和 <项目ID>/config.yaml 写入输出目标
+        
+        issues为启用校验时本次调用的问题列表，见__init__的validate
+        
+        Returns:
+            项目结构
+        """
+        project_data, section_params, descriptions = self.parse_project_block(block_rows)
+        with self._collect_issues(issues) as issues:
+            if self.validator is not None:
+                self.validator.check_project(project_id, project_data, issues)
+            sink.write(f"{project_id}/result.json",
+                       json.dumps({project_id: project_data}, indent=4, ensure_ascii=False))
+            with sink.open(f"{project_id}/config.yaml") as stream:
+                self._write_yaml_sections(stream, section_params, descriptions, sink, project_id, issues)
+        return project_data
     
-    def convert_csv_to_json(self, csv_file_path: str, output_json_path: str = None) -> str:
+    def convert_csv_to_json(self, csv_file_path: str, output_json_path: str = None,
+                            sink: Optional[OutputSink] = None, issues: Optional[List[str]] = None) -> Optional[str]:
         """
         将CSV文件转换为JSON格式
+        
+        memory_limit生效且指定了output_json_path时，JSON边解析边写入文件，不在内存中组装，返回None；
+        其余情况返回整个JSON字符串，其大小随输出增长，不受memory_limit限制
+        （转换超大表格时请指定output_json_path，或用write_rows_to_json写入自己的文本流）
+        
+        Args:
+            csv_file_path: CSV文件路径
+            output_json_path: JSON文件保存路径，为空时不保存
+            sink: 附带生成的config.yaml的输出目标，默认使用self.output_sink
+            issues: 启用校验时本次调用的问题列表，为None时有问题则抛出OutputValidationError，不保存JSON文件
         """
-        # 解析CSV
-        data_dict = self.parse_csv_to_dict(csv_file_path)
+        if self.memory_limit is not None and output_json_path:
+            # 直接流式写入保存位置的临时文件，完成后替换；出错或校验未通过时不留下文件
+            target = DirectorySink(os.path.dirname(os.path.abspath(output_json_path)))
+            with target.open(os.path.basename(output_json_path)) as out, \
+                    open(csv_file_path, 'r', encoding='utf-8') as file:
+                self.write_rows_to_json(csv.reader(file), out, sink=sink, issues=issues)
+            print(f"JSON文件已保存到: {output_json_path}")
+            return None
         
-        # 转换为JSON字符串
-        json_str = json.dumps(data_dict, indent=4, ensure_ascii=False)
+        with self._collect_issues(issues) as issues:
+            if self.memory_limit is not None:
+                # 内存有上限时流式解析，不把整个CSV读入内存（返回的字符串仍包含整个文档）
+                buffer = io.StringIO()
+                with open(csv_file_path, 'r', encoding='utf-8') as file:
+                    self.write_rows_to_json(csv.reader(file), buffer, sink=sink, issues=issues)
+                json_str = buffer.getvalue()
+            else:
+                # 解析CSV
+                data_dict = self.parse_csv_to_dict(csv_file_path, sink=sink, issues=issues)
+                
+                # 转换为JSON字符串
+                json_str = json.dumps(data_dict, indent=4, ensure_ascii=False)
         
         # 如果指定了输出路径，保存到文件
         if output_json_path:
@@ -341,47 +1022,39 @@ class CSVToJSONConverter:
         
         return json_str
     
-    def convert_csv_to_yaml(self, csv_file_path: str, output_yaml_path: str = None, silent: bool = False) -> str:
+    def convert_rows_to_json(self, rows: List[List[str]], issues: Optional[List[str]] = None) -> str:
         """
-        将CSV文件转换为YAML格式
+        将内存中的CSV行转换为JSON格式，不写任何文件
         """
-        # 解析CSV获取参数
-        sensor_params = {}
-        robot_params = {}
-        
-        with open(csv_file_path, 'r', encoding='utf-8') as file:
-            csv_reader = csv.reader(file)
-            rows = list(csv_reader)
-            
-            current_group = None
-            for row in rows[1:]:  # 跳过标题行
-                if len(row) < 4:
-                    continue
-                    
-                version, group, type_name, value = row[0], row[1], row[2], row[3]
-                
-                # 如果group不为空，更新当前组
-                if group:
-                    current_group = group
-                
-                # 处理传感器参数（如果有Define列的话）
-                if current_group == "Sensor_Parameter" and len(row) > 5:
-                    define = row[5] if len(row) > 5 else None
-                    if define and value and value != "无":
-                        sensor_params[define] = self._convert_value(value)
-                
-                # 处理机器人参数
-                elif current_group == "robot" and len(row) > 5:
-                    define = row[5] if len(row) > 5 else None
-                    if define and value:
-                        robot_params[define] = self._convert_value(value)
+        data_dict = self.parse_rows_to_dict(rows, generate_yaml=False, issues=issues)
+        return json.dumps(data_dict, indent=4, ensure_ascii=False)
+    
+    def convert_csv_to_yaml(self, csv_file_path: str, output_yaml_path: str = None, silent: bool = False,
+                            sink: Optional[OutputSink] = None, issues: Optional[List[str]] = None) -> str:
+        """
+        将CSV文件转换为YAML格式
         
-        # 使用_generate_yaml_file方法生成YAML内容（支持二维数组）
-        self._generate_yaml_file(sensor_params, robot_params, silent=True)
+        Args:
+            csv_file_path: CSV文件路径
+            output_yaml_path: YAML文件保存路径，为空时不保存；.npy旁路文件同时写在它所在的目录
+            silent: 不打印保存信息
+            sink: config.yaml的输出目标，默认使用self.output_sink
+            issues: 启用校验时本次调用的问题列表，为None时有问题则抛出OutputValidationError，不写出YAML
+        """
+        sink = sink or self.output_sink
+        array_sink = sink
+        if output_yaml_path and sink.supports_binary:
+            # YAML中的引用是相对路径，旁路文件同时写在保存位置旁
+            array_sink = TeeSink(sink, DirectorySink(os.path.dirname(os.path.abspath(output_yaml_path))))
         
-        # 读取生成的YAML文件内容
-        with open("output/config.yaml", 'r', encoding='utf-8') as f:
-            yaml_str = f.read()
+        # 逐行读取，只解析到第一个项目块结束为止；memory_limit生效时参数超过上限后转存到临时磁盘
+        if self.selected_versions is not None:
+            rows = self.iter_selected_rows(CSVRowIndex.load_or_build(csv_file_path))
+            yaml_str = self._rows_to_yaml(rows, array_sink, issues)
+        else:
+            with open(csv_file_path, 'r', encoding='utf-8') as file:
+                yaml_str = self._rows_to_yaml(csv.reader(file), array_sink, issues)
+        sink.write("config.yaml", yaml_str)
         
         # 如果指定了输出路径，保存到文件
         if output_yaml_path:
@@ -391,7 +1064,52 @@ class CSVToJSONConverter:
                 print(f"YAML文件已保存到: {output_yaml_path}")
         
         return yaml_str
-
+    
+    @staticmethod
+    def _sidecar_name(section: str, key: str) -> Optional[str]:
+        """
+        数组参数的.npy旁路文件名；段落或参数名不能安全地用作文件名时返回None，该数组直接写入YAML
+        """
+        if _SIDECAR_NAME_PART.fullmatch(section) and _SIDECAR_NAME_PART.fullmatch(key):
+            return f"{section}.{key}.npy"
+        return None
+    
+    def convert_rows_to_yaml(self, rows: Iterable[List[str]], issues: Optional[List[str]] = None) -> str:
+        """
+        将CSV行转换为YAML格式，不写任何文件
+        
+        rows可以是逐行产出的迭代器（如标准输入上的csv.reader），只读取到第一个项目块结束为止；
+        issues为启用校验时本次调用的问题列表，见__init__的validate
+        """
+        return self._rows_to_yaml(rows, issues=issues)
+    
+    def _rows_to_yaml(self, rows: Iterable[List[str]], array_sink: Optional[OutputSink] = None,
+                      issues: Optional[List[str]] = None) -> str:
+        """
+        由CSV行生成第一个项目的YAML内容，memory_limit生效时参数超过上限后转存到临时磁盘
+        
+        array_sink为.npy旁路文件的输出目标，为空时数组直接写入YAML
+        """
+        with self._collect_issues(issues) as issues:
+            if self.memory_limit is not None:
+                buffer = io.StringIO()
+                with SpillTable(self.memory_limit) as params:
+                    _, block_rows = next(self.iter_block_streams(rows), ("unknown", ()))
+                    self._feed_block(SpillingBlockState(self._new_project_data(), params), block_rows)
+                    sections = ((section, self._iter_spilled_entries(params, section))
+                                for section in self.yaml_sections)
+                    self._write_yaml_entries(buffer, sections, array_sink, issues=issues)
+                return buffer.getvalue()
+            section_params, descriptions = self._collect_yaml_params(rows)
+            return self._build_yaml_content(section_params, descriptions, array_sink, issues)
+    
+    def _collect_yaml_params(self, rows: Iterable[List[str]]) -> tuple:
+        """
+        从CSV行中收集第一个项目的各段落参数和参数解释
+        """
+        _, block_rows = next(self.iter_version_blocks(rows), ("unknown", []))
+        _, section_params, descriptions = self.parse_project_block(block_rows)
+        return section_params, descriptions
 
 def main():
     """
@@ -408,8 +1126,10 @@ def main():
         return
     
     # 转换为JSON
-    json_output = converter.convert_csv_to_json(csv_file, "output/result.json")
-    print(f"✅ 转换完成！输出文件: output/result.json")
+    sink = DirectorySink("output")
+    json_output = converter.convert_csv_to_json(csv_file, sink=sink)
+    sink.write("result.json", json_output)
+    print(f"✅ 转换完成！输出文件: {sink.path_for('result.json')}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地HTTP转换服务
+常驻一组预先初始化的转换器，POST CSV内容即可拿到JSON或YAML，
+省去每次调用convert.py的解释器启动、配置加载和磁盘读写
+"""
+
+import argparse
+import csv
+import io
+import os
+import queue
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import urlparse, parse_qs
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_to_json_converter import CSVToJSONConverter
+
+
+CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "yaml": "application/x-yaml; charset=utf-8",
+}
+# 默认的请求体大小上限（字节）
+DEFAULT_MAX_BODY_SIZE = 64 * 1024 * 1024
+
+
+class ConverterPool:
+    """预先初始化的转换器池，每个请求独占一个转换器"""
+
+    def __init__(self, size: int = 4, config_file: str = "config/mapping_config.json"):
+        """
+        初始化转换器池
+
+        Args:
+            size: 转换器数量，即同时处理的请求数上限
+            config_file: 映射配置文件路径
+        """
+        if size < 1:
+            raise ValueError("转换器池大小必须大于0")
+        self.size = size
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(CSVToJSONConverter(config_file))
+
+    def acquire(self, timeout: Optional[float] = None) -> CSVToJSONConverter:
+        """取出一个空闲转换器，超时抛出queue.Empty"""
+        return self._idle.get(timeout=timeout)
+
+    def release(self, converter: CSVToJSONConverter):
+        """归还转换器"""
+        self._idle.put(converter)
+
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """
+    处理转换请求
+
+    POST /convert?format=json|yaml  请求体为UTF-8编码的CSV内容
+    GET  /health                    健康检查
+
+    错误响应带 Connection: close 并关闭连接：请求体可能没有读取，连接上剩余的字节不能当作下一个请求
+    """
+
+    # HTTP/1.1 默认保持连接，响应必须带Content-Length
+    protocol_version = "HTTP/1.1"
+    server_version = "csv2json"
+    # 响应头和响应体分两次写出，关闭Nagle算法避免与延迟确认叠加产生40ms等待
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._send(200, "ok\n", "text/plain; charset=utf-8")
+        else:
+            self._send(404, "未知路径\n", "text/plain; charset=utf-8")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/convert":
+            self._send(404, "未知路径\n", "text/plain; charset=utf-8")
+            return
+
+        output_format = parse_qs(url.query).get("format", ["json"])[0].lower()
+        if output_format not in CONTENT_TYPES:
+            self._send(400, f"不支持的输出格式: {output_format}\n", "text/plain; charset=utf-8")
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send(400, "Content-Length无效\n", "text/plain; charset=utf-8")
+            return
+        if length > self.server.max_body_size:
+            self._send(400, f"请求体超过上限 {self.server.max_body_size} 字节\n", "text/plain; charset=utf-8")
+            return
+        body = self.rfile.read(length)
+
+        try:
+            rows = list(csv.reader(io.StringIO(body.decode("utf-8-sig"))))
+        except (UnicodeDecodeError, csv.Error) as e:
+            self._send(400, f"CSV内容无效: {e}\n", "text/plain; charset=utf-8")
+            return
+
+        try:
+            converter = self.server.pool.acquire(timeout=self.server.acquire_timeout)
+        except queue.Empty:
+            self._send(503, "转换器繁忙，请稍后重试\n", "text/plain; charset=utf-8")
+            return
+
+        try:
+            if output_format == "yaml":
+                output = converter.convert_rows_to_yaml(rows)
+            else:
+                output = converter.convert_rows_to_json(rows)
+        except Exception as e:
+            self._send(500, f"转换失败: {e}\n", "text/plain; charset=utf-8")
+            return
+        finally:
+            self.server.pool.release(converter)
+
+        self._send(200, output, CONTENT_TYPES[output_format])
+
+    def _send(self, status: int, text: str, content_type: str):
+        """发送完整响应，错误响应发送后关闭连接"""
+        payload = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        if status >= 400:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """带转换器池的多线程HTTP服务"""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, pool: ConverterPool,
+                 acquire_timeout: float = 30.0, quiet: bool = False,
+                 max_body_size: int = DEFAULT_MAX_BODY_SIZE):
+        super().__init__(address, ConversionRequestHandler)
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.quiet = quiet
+        # Content-Length超过该值的请求直接拒绝，不读取请求体
+        self.max_body_size = max_body_size
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = 4,
+          config_file: str = "config/mapping_config.json", quiet: bool = False,
+          max_body_size: int = DEFAULT_MAX_BODY_SIZE):
+    """启动转换服务，直到Ctrl+C退出"""
+    pool = ConverterPool(workers, config_file)
+    server = ConversionServer((host, port), pool, quiet=quiet, max_body_size=max_body_size)
+    print(f"转换服务已启动: http://{host}:{server.server_address[1]}/convert （{workers}个转换器）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """
+    主函数
+    
+    Args:
+        argv: 命令行参数，默认读取sys.argv
+        prog: 帮助信息中显示的程序名
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="本地CSV转换HTTP服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--workers", type=int, default=4, help="预先初始化的转换器数量")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    parser.add_argument("--max-body", type=int, default=DEFAULT_MAX_BODY_SIZE // (1024 * 1024), metavar="MB",
+                        help="请求体大小上限（MB，默认64），超过时返回400")
+    parser.add_argument("--quiet", action="store_true", help="不输出访问日志")
+    args = parser.parse_args(argv)
+
+    serve(args.host, args.port, args.workers, args.config, args.quiet, args.max_body * 1024 * 1024)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
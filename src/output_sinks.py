@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换结果的输出目标
+转换器只按名称写出结果，写到内存、目录、标准输出还是归档文件由输出目标决定
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tarfile
+import threading
+import time
+import zipfile
+from typing import Dict, Iterator, Optional, TextIO, Union
+
+
+class OutputSink:
+    """输出目标基类，name为相对路径形式的结果名称，如 config.yaml"""
+
+    # 是否支持写出二进制结果（如.npy旁路文件）
+    supports_binary = False
+
+    def write(self, name: str, content: str):
+        """写出一个结果"""
+        raise NotImplementedError
+
+    def write_bytes(self, name: str, data: bytes):
+        """写出一个二进制结果，仅supports_binary为True的输出目标支持"""
+        raise NotImplementedError(f"{type(self).__name__} 不支持二进制结果")
+
+    @contextlib.contextmanager
+    def open(self, name: str) -> Iterator[TextIO]:
+        """
+        以文本流的形式写出一个结果，退出时提交；发生异常时不写出
+
+        默认先缓存在内存中再调用write，能直接写入底层文件的输出目标应覆盖此方法
+        """
+        buffer = io.StringIO()
+        yield buffer
+        self.write(name, buffer.getvalue())
+
+    def close(self):
+        """释放资源"""
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class MemorySink(OutputSink):
+    """保存在内存中，不产生任何磁盘写入"""
+
+    supports_binary = True
+
+    def __init__(self):
+        self.outputs: Dict[str, Union[str, bytes]] = {}
+
+    def write(self, name: str, content: str):
+        self.outputs[name] = content
+
+    def write_bytes(self, name: str, data: bytes):
+        self.outputs[name] = data
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[Union[str, bytes]]:
+        """读取已写出的结果"""
+        return self.outputs.get(name, default)
+
+
+class DirectorySink(OutputSink):
+    """写入目录，子目录按需创建；先写临时文件再替换，并发写同一结果时不会产生半截文件"""
+
+    supports_binary = True
+
+    def __init__(self, root: str = "output"):
+        self.root = root
+
+    def path_for(self, name: str) -> str:
+        """结果在磁盘上的路径"""
+        return os.path.join(self.root, name)
+
+    def write(self, name: str, content: str):
+        with self.open(name) as f:
+            f.write(content)
+
+    def write_bytes(self, name: str, data: bytes):
+        with self.open(name, binary=True) as f:
+            f.write(data)
+
+    @contextlib.contextmanager
+    def open(self, name: str, binary: bool = False) -> Iterator[TextIO]:
+        """直接写入临时文件，退出时替换为目标文件"""
+        path = self.path_for(name)
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with (open(temp_path, 'wb') if binary else open(temp_path, 'w', encoding='utf-8')) as f:
+                yield f
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+class StdoutSink(OutputSink):
+    """写到标准输出（或任意文本流）"""
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def write(self, name: str, content: str):
+        stream = self.stream or sys.stdout
+        stream.write(content)
+        if not content.endswith("\n"):
+            stream.write("\n")
+        stream.flush()
+
+
+class ArchiveSink(OutputSink):
+    """
+    写入单个zip或tar归档，整个批次只持有一个文件句柄
+
+    归档格式按扩展名判断：.zip、.tar、.tar.gz/.tgz、.tar.bz2、.tar.xz
+    """
+
+    TAR_MODES = {
+        ".tar": "w",
+        ".tar.gz": "w:gz",
+        ".tgz": "w:gz",
+        ".tar.bz2": "w:bz2",
+        ".tar.xz": "w:xz",
+    }
+
+    supports_binary = True
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        lower = path.lower()
+        if lower.endswith(".zip"):
+            self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+            self._tar = None
+        else:
+            mode = next((m for ext, m in self.TAR_MODES.items() if lower.endswith(ext)), None)
+            if mode is None:
+                raise ValueError(f"不支持的归档格式: {path}")
+            self._zip = None
+            self._tar = tarfile.open(path, mode)
+
+    @staticmethod
+    def is_archive_path(path: str) -> bool:
+        """路径是否为支持的归档格式"""
+        lower = path.lower()
+        return lower.endswith(".zip") or any(lower.endswith(ext) for ext in ArchiveSink.TAR_MODES)
+
+    def write(self, name: str, content: str):
+        self.write_bytes(name, content.encode('utf-8'))
+
+    def write_bytes(self, name: str, data: bytes):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.writestr(name, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = int(time.time())
+                self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+            elif self._tar is not None:
+                self._tar.close()
+
+
+class TeeSink(OutputSink):
+    """把每个结果同时写入多个输出目标，全部支持二进制时才支持二进制结果"""
+
+    def __init__(self, *sinks: OutputSink):
+        self.sinks = sinks
+        self.supports_binary = all(sink.supports_binary for sink in sinks)
+
+    def write(self, name: str, content: str):
+        for sink in self.sinks:
+            sink.write(name, content)
+
+    def write_bytes(self, name: str, data: bytes):
+        for sink in self.sinks:
+            sink.write_bytes(name, data)
+
+
+def open_sink(target: Optional[str]) -> OutputSink:
+    """
+    根据目标字符串创建输出目标
+
+    None 为内存，"-" 为标准输出，归档扩展名为归档文件，其余视为目录
+    """
+    if target is None:
+        return MemorySink()
+    if target == "-":
+        return StdoutSink()
+    if ArchiveSink.is_archive_path(target):
+        return ArchiveSink(target)
+    return DirectorySink(target)
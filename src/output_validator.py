@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+转换结果的输出校验
+加载配置时把mapping_config.json中的型号目录、通信类型和版本约束编译成集合，
+每个项目和每个YAML参数只做几次集合查找和类型判断，在输出过程中逐个校验
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy为可选依赖，未安装时不会出现数组参数
+    np = None
+
+# YAML参数名：不能含空白、冒号、#等会破坏 "key: value" 行的字符
+_KEY_PATTERN = re.compile(r"[A-Za-z0-9_][A-Za-z0-9_.\-]*")
+# 不带引号的YAML标量不能以这些字符开头
+_PLAIN_INDICATORS = frozenset("]},#&*!|>%@`")
+
+
+class OutputValidationError(ValueError):
+    """输出校验未通过，issues为全部问题的描述"""
+
+    def __init__(self, issues: List[str]):
+        # 只把issues放进args，跨进程传递时可以原样还原
+        super().__init__(issues)
+        self.issues = issues
+
+    def __str__(self) -> str:
+        return f"输出校验未通过，共 {len(self.issues)} 处问题"
+
+
+class OutputValidator:
+    """
+    由转换器的配置编译出的校验器，只保存编译好的规则；问题追加到每次调用传入的列表中，
+    因此转换器实例仍可在多线程间共享
+    """
+
+    def __init__(self, converter):
+        """
+        Args:
+            converter: 已加载配置的CSVToJSONConverter
+        """
+        config = converter.config
+        template = converter._new_project_data()
+        self.project_prefix = config.get("project_prefix", "project_")
+
+        # 项目结构允许的顶层字段：固定字段加上mapping分组的目标字段
+        mapping_targets = {options.get("target", "comm")
+                           for handler, options in converter.group_handlers.values() if handler == "mapping"}
+        self.project_keys = frozenset(template) | mapping_targets
+        self.sensor_keys = frozenset(template["sensor"])
+        # 通信类型经映射表转换后的名称（如rpmsg -> ipc），与mapping处理器的输出一致
+        self.comm_names = frozenset(converter.chinese_to_english_map.get(name, name)
+                                    for name in config.get("communication_types", {}))
+
+        # 传感器 -> 型号目录中的标准化名称
+        legacy_models = {name for name in config.get("sensor_models", {}).values() if name is not None}
+        self.sensor_models = {
+            key: frozenset(name for name in config.get(f"{key}_models", {}).values() if name is not None)
+                 | legacy_models
+            for key in self.sensor_keys
+        }
+
+        # 版本号 -> [(传感器, 传感器类型, 排除的型号, 允许的型号或None)]
+        self.version_rules: Dict[str, List[tuple]] = {}
+        for version, rules in config.get("constraint_rules", {}).items():
+            compiled = []
+            for type_name, rule in rules.items():
+                key = converter.chinese_to_english_map.get(type_name)
+                if key not in self.sensor_keys:
+                    continue
+                excluded = frozenset(converter.normalize_sensor_name(type_name, model)
+                                     for model in rule.get("excluded_models", [])) - {None}
+                allowed = None
+                if "allowed_models" in rule:
+                    allowed = frozenset(converter.normalize_sensor_name(type_name, model)
+                                        for model in rule["allowed_models"]) - {None}
+                compiled.append((key, type_name, excluded, allowed))
+            self.version_rules[str(version)] = compiled
+
+    def check_project(self, project_id: str, project_data: Dict[str, Any], issues: List[str]) -> bool:
+        """校验result.json中的一个项目，问题追加到issues，返回是否通过"""
+        problems = []
+        version = project_id[len(self.project_prefix):]
+        if not project_id.startswith(self.project_prefix) or not version:
+            problems.append(f"项目ID不是 {self.project_prefix}<版本号> 的形式")
+        elif version == "unknown":
+            problems.append("第一个版本号之前的行没有版本号")
+
+        extra = project_data.keys() - self.project_keys
+        if extra:
+            problems.append(f"未知的字段 {', '.join(sorted(extra))}")
+
+        sensors = project_data.get("sensor")
+        if not isinstance(sensors, dict) or sensors.keys() != self.sensor_keys:
+            problems.append(f"sensor应包含且只包含 {', '.join(sorted(self.sensor_keys))}")
+        else:
+            for key, allowed in self.sensor_models.items():
+                model = sensors[key]
+                if model is not None and model not in allowed:
+                    problems.append(f"sensor.{key} 的型号 {model} 不在 {key}_models 目录中")
+            for key, type_name, excluded, allowed in self.version_rules.get(version, ()):
+                model = sensors[key]
+                if model is not None and (model in excluded or (allowed is not None and model not in allowed)):
+                    problems.append(f"版本 {version} 的约束不允许{type_name}型号 {model}")
+
+        comm = project_data.get("comm")
+        if not isinstance(comm, dict):
+            problems.append("comm应为对象")
+        else:
+            for key, value in comm.items():
+                if key not in self.comm_names:
+                    problems.append(f"comm中的 {key} 不在 communication_types 中")
+                if value not in self.comm_names:
+                    problems.append(f"comm.{key} 的值 {value} 不在 communication_types 中")
+
+        if problems:
+            issues.extend(f"{project_id}: {problem}" for problem in problems)
+            return False
+        return True
+
+    def check_param(self, location: str, section: str, key: str, value: Any, comment: str,
+                    issues: List[str]) -> bool:
+        """
+        校验一个即将写入YAML的参数及其注释，location为所在文件（用于问题描述），问题追加到issues，返回是否通过
+        """
+        problem = None
+        kind = type(value)
+        if not _KEY_PATTERN.fullmatch(key):
+            problem = "参数名含有YAML中不能直接使用的字符"
+        elif "\n" in comment or "\r" in comment:
+            problem = "注释中含有换行"
+        elif kind is int or kind is float:
+            return True
+        elif kind is str:
+            problem = self._plain_scalar_problem(value)
+        elif np is not None and isinstance(value, np.ndarray):
+            # 超过npy_threshold的数值二维数组，写入旁路文件或展开成列表
+            if value.ndim != 2 or value.dtype.kind not in "biuf":
+                problem = "数组参数应为数值二维数组"
+        elif kind is list:
+            for row in value:
+                if not isinstance(row, list) or not all(isinstance(item, (int, float, str)) for item in row):
+                    problem = "数组的每一行都应是数字或字符串的列表"
+                    break
+        elif value is not None:
+            problem = f"不支持的值类型 {kind.__name__}"
+
+        if problem is None:
+            return True
+        issues.append(f"{location} {section}.{key}: {problem}")
+        return False
+
+    @staticmethod
+    def _plain_scalar_problem(value: str) -> Optional[str]:
+        """字符串原样写在 "key: value" 之后时会被YAML误读的原因，没有问题时返回None"""
+        if not value:
+            return "值为空"
+        if "\n" in value or "\r" in value:
+            return "值中含有换行"
+        if value != value.strip():
+            return "值的首尾有空白"
+        first = value[0]
+        if first == '"' or first == "'":
+            # 带引号的值需要完整闭合
+            if len(value) < 2 or value[-1] != first:
+                return "引号没有闭合"
+            return None
+        if first == "[" or first == "{":
+            # 流式序列/映射需要完整闭合
+            if value[-1] != ("]" if first == "[" else "}"):
+                return "括号没有闭合"
+            return None
+        if first in _PLAIN_INDICATORS or value in ("-", "?", ":") or value.startswith(("- ", "? ", ": ")):
+            return f"以YAML指示符 {first} 开头"
+        if ": " in value or value.endswith(":"):
+            return "值中含有 \": \"，会被当作映射"
+        if " #" in value:
+            return "值中含有 \" #\"，之后的内容会被当作注释"
+        return None
+
+
+def raise_for_issues(issues: Optional[List[str]]):
+    """issues中有问题时抛出OutputValidationError"""
+    if issues:
+        raise OutputValidationError(list(issues))
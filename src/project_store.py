@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite项目库
+把解析后的项目、传感器、通信等字段和参数写入本地SQLite数据库并建立索引，
+按表格增量更新（只重新解析哈希变化的项目块），用于跨项目的快速查询
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_index import CSVRowIndex
+from csv_to_json_converter import CSVToJSONConverter
+from sheet_diff import block_hashes, _json_default
+
+# 视为项目库的导出目标扩展名
+STORE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# 参数值的JSON编码器，逐值调用json.dumps时每次都会新建编码器
+_encode_json = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+
+# 库结构的版本（PRAGMA user_version），不一致时重建
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sheets (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS providers (
+    sheet TEXT NOT NULL,
+    version TEXT NOT NULL,
+    block_hash TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    PRIMARY KEY (sheet, version)
+);
+CREATE TABLE IF NOT EXISTS projects (
+    project_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    sheet TEXT NOT NULL,
+    block_hash TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fields (
+    project_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    project_id TEXT NOT NULL,
+    section TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT,
+    description TEXT
+);
+CREATE INDEX IF NOT EXISTS providers_version ON providers (version, seq);
+CREATE INDEX IF NOT EXISTS projects_version ON projects (version);
+CREATE INDEX IF NOT EXISTS projects_sheet ON projects (sheet);
+CREATE INDEX IF NOT EXISTS fields_value ON fields (category, value, project_id);
+CREATE INDEX IF NOT EXISTS fields_project ON fields (project_id);
+CREATE INDEX IF NOT EXISTS params_key ON params (key, project_id);
+CREATE INDEX IF NOT EXISTS params_project ON params (project_id);
+CREATE VIEW IF NOT EXISTS sensors AS
+    SELECT project_id, name AS sensor, value AS model FROM fields WHERE category = 'sensor';
+CREATE VIEW IF NOT EXISTS comm AS
+    SELECT project_id, name, value FROM fields WHERE category = 'comm';
+"""
+
+_DROP_SCHEMA = """
+DROP VIEW IF EXISTS sensors;
+DROP VIEW IF EXISTS comm;
+DROP TABLE IF EXISTS sheets;
+DROP TABLE IF EXISTS providers;
+DROP TABLE IF EXISTS projects;
+DROP TABLE IF EXISTS fields;
+DROP TABLE IF EXISTS params;
+"""
+
+
+def is_store_path(path: str) -> bool:
+    """导出目标是否为项目库"""
+    return path.lower().endswith(STORE_SUFFIXES)
+
+
+def _field_value(value: Any) -> Optional[str]:
+    """字段值：字符串原样保存，None为NULL，其余保存为JSON"""
+    if value is None or isinstance(value, str):
+        return value
+    return _encode_json(value)
+
+
+class ProjectStore:
+    """
+    项目库
+
+    表：providers（每个表格含有的版本及块哈希）、projects（项目结构的JSON和当前内容的来源表格）、fields（项目结构的第二层字段，如 sensor/lidar、comm/ipc）、
+    params（YAML参数，值为JSON），以及视图sensors和comm
+    """
+
+    def __init__(self, db_path: str, converter: Optional[CSVToJSONConverter] = None):
+        """
+        Args:
+            db_path: 数据库路径，不存在时创建
+            converter: 用于解析表格的转换器
+        """
+        self.db_path = db_path
+        self.converter = converter or CSVToJSONConverter()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(db_path)
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+            # 项目库随时可以由表格重新生成，结构变化时直接重建
+            self.db.executescript(_DROP_SCHEMA)
+            self.db.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        """关闭数据库"""
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def upsert_sheet(self, csv_path: str) -> Dict[str, int]:
+        """
+        用一个表格的内容更新项目库，只解析新增或发生变化的项目块，整个表格在一个事务中提交
+
+        同一版本出现在多个表格中时，以最后更新（内容发生变化）的表格为准；该表格删除这个版本后，
+        改用仍含有该版本的其他表格重新解析，所有表格都不再含有时才从库中删除。
+        映射配置变化后，表格中的全部项目重新解析
+
+        Returns:
+            {"added", "updated", "removed", "unchanged"} 各自的项目数
+        """
+        sheet_key = os.path.abspath(csv_path)
+        stat = os.stat(csv_path)
+        config_digest = self.converter.config_digest
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        previous = self.db.execute("SELECT size, mtime_ns, config FROM sheets WHERE path = ?",
+                                   (sheet_key,)).fetchone()
+        if previous == (stat.st_size, stat.st_mtime_ns, config_digest):
+            # 表格和配置都未修改，无需读取
+            stats["unchanged"] = self.db.execute("SELECT COUNT(*) FROM providers WHERE sheet = ?",
+                                                 (sheet_key,)).fetchone()[0]
+            return stats
+
+        index = CSVRowIndex.load_or_build(csv_path)
+        hashes = block_hashes(index)
+        provided = {version: digest for version, digest in self.db.execute(
+            "SELECT version, block_hash FROM providers WHERE sheet = ?", (sheet_key,))}
+        # 配置变化后旧的块哈希不能说明项目未变
+        existing = provided if previous is not None and previous[2] == config_digest else {}
+
+        with self.db:
+            for version, (digest, start_row, stop_row) in hashes.items():
+                if existing.get(version) == digest:
+                    stats["unchanged"] += 1
+                    continue
+                project_id = self.converter.project_id(version)
+                parsed = self.converter.parse_project_block(index.read_rows(start_row, stop_row))
+                known = self._delete_project(project_id)
+                self._insert_project(project_id, version, sheet_key, digest, parsed)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO providers (sheet, version, block_hash, seq) "
+                    "VALUES (?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM providers))",
+                    (sheet_key, version, digest))
+                stats["updated" if known else "added"] += 1
+
+            # 表格中已删除的版本
+            for version in provided:
+                if version in hashes:
+                    continue
+                self.db.execute("DELETE FROM providers WHERE sheet = ? AND version = ?", (sheet_key, version))
+                project_id = self.converter.project_id(version)
+                source = self.db.execute("SELECT sheet FROM projects WHERE project_id = ?",
+                                         (project_id,)).fetchone()
+                if source is not None and source[0] != sheet_key:
+                    # 当前内容来自其他表格，不受影响
+                    continue
+                if self._restore_from_providers(project_id, version):
+                    stats["updated"] += 1
+                else:
+                    self._delete_project(project_id)
+                    stats["removed"] += 1
+
+            self.db.execute("INSERT OR REPLACE INTO sheets (path, size, mtime_ns, config) VALUES (?, ?, ?, ?)",
+                            (sheet_key, stat.st_size, stat.st_mtime_ns, config_digest))
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            # 更新统计信息，查询时按版本号等选择性高的索引检索
+            self.db.execute("ANALYZE")
+        return stats
+
+    def _restore_from_providers(self, project_id: str, version: str) -> bool:
+        """
+        用其余含有该版本的表格中最后更新的一个重新解析，返回是否找到；已不再含有该版本的表格从来源中移除
+        """
+        candidates = self.db.execute("SELECT sheet, block_hash FROM providers WHERE version = ? ORDER BY seq DESC",
+                                     (version,)).fetchall()
+        for sheet_key, digest in candidates:
+            try:
+                index = CSVRowIndex.load_or_build(sheet_key)
+                block = index.block_map().get(version)
+            except OSError:
+                block = None
+            if block is None:
+                self.db.execute("DELETE FROM providers WHERE sheet = ? AND version = ?", (sheet_key, version))
+                continue
+            parsed = self.converter.parse_project_block(index.read_rows(*block))
+            self._delete_project(project_id)
+            self._insert_project(project_id, version, sheet_key, digest, parsed)
+            return True
+        return False
+
+    def _delete_project(self, project_id: str) -> bool:
+        """删除项目及其字段和参数，返回项目是否存在"""
+        cursor = self.db.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+        self.db.execute("DELETE FROM fields WHERE project_id = ?", (project_id,))
+        self.db.execute("DELETE FROM params WHERE project_id = ?", (project_id,))
+        return cursor.rowcount > 0
+
+    def _insert_project(self, project_id: str, version: str, sheet_key: str, digest: str, parsed: tuple):
+        """写入parse_project_block的解析结果"""
+        project_data, section_params, descriptions = parsed
+        self.db.execute(
+            "INSERT INTO projects (project_id, version, sheet, block_hash, data) VALUES (?, ?, ?, ?, ?)",
+            (project_id, version, sheet_key, digest, _encode_json(project_data)))
+        self.db.executemany(
+            "INSERT INTO fields (project_id, category, name, value) VALUES (?, ?, ?, ?)",
+            [(project_id, category, name, _field_value(value))
+             for category, entries in project_data.items() if isinstance(entries, dict)
+             for name, value in entries.items()])
+        self.db.executemany(
+            "INSERT INTO params (project_id, section, key, value, description) VALUES (?, ?, ?, ?, ?)",
+            [(project_id, section, key, _encode_json(value), descriptions.get(key))
+             for section, params in section_params.items()
+             for key, value in params.items()])
+
+    def _filter_clause(self, sensors: List[str], comms: List[str],
+                       versions: List[str]) -> Tuple[str, List[str]]:
+        """
+        按传感器型号、通信方式、版本号筛选项目的WHERE子句；中文名称先经映射表转换
+
+        指定版本号时由版本号索引确定候选项目，其余条件逐个检查；否则由第一个字段条件的索引确定候选项目
+        """
+        conditions = []
+        args = []
+        terms = [(category, term) for category, values in (("sensor", sensors), ("comm", comms))
+                 for term in values]
+        for i, (category, term) in enumerate(terms):
+            candidates = {term, self.converter.chinese_to_english_map.get(term) or term}
+            placeholders = ', '.join('?' * len(candidates))
+            if i == 0 and not versions:
+                conditions.append(f"p.project_id IN (SELECT project_id FROM fields WHERE category = ? "
+                                  f"AND value IN ({placeholders}))")
+            else:
+                conditions.append(f"EXISTS (SELECT 1 FROM fields f WHERE f.project_id = p.project_id "
+                                  f"AND f.category = ? AND f.value IN ({placeholders}))")
+            args += [category, *candidates]
+        if versions:
+            conditions.append(f"p.version IN ({', '.join('?' * len(versions))})")
+            args += versions
+        return (" WHERE " + " AND ".join(conditions)) if conditions else "", args
+
+    def find_projects(self, sensors: List[str] = (), comms: List[str] = (),
+                      versions: List[str] = ()) -> List[str]:
+        """
+        查找同时满足全部条件的项目ID，如 find_projects(sensors=["欢创PMA2"], comms=["rpmsg"])
+        """
+        where, args = self._filter_clause(list(sensors), list(comms), list(versions))
+        return [row[0] for row in self.db.execute(
+            f"SELECT p.project_id FROM projects p{where} ORDER BY p.project_id", args)]
+
+    def param_values(self, key: str, sensors: List[str] = (), comms: List[str] = (),
+                     versions: List[str] = ()) -> List[Tuple[str, str, Any]]:
+        """
+        查询参数在满足条件的各项目中的取值，如 param_values("LaserBiasAngle", versions=["2407"])
+
+        Returns:
+            [(项目ID, YAML段落, 值)]
+        """
+        where, args = self._filter_clause(list(sensors), list(comms), list(versions))
+        where = where.replace(" WHERE ", " AND ", 1) if where else ""
+        rows = self.db.execute(
+            f"SELECT p.project_id, m.section, m.value FROM params m "
+            f"JOIN projects p ON p.project_id = m.project_id WHERE m.key = ?{where} "
+            f"ORDER BY p.project_id, m.section", [key, *args])
+        return [(project_id, section, json.loads(value)) for project_id, section, value in rows]
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """
+    主函数：查询项目库
+
+    Args:
+        argv: 命令行参数，默认读取sys.argv
+        prog: 帮助信息中显示的程序名
+    """
+    parser = argparse.ArgumentParser(
+        prog=prog, description="查询项目库（用 convert.py export 表格.csv -o 项目库.db 建立或更新）")
+    parser.add_argument("database", help="项目库路径")
+    parser.add_argument("--sensor", action="append", default=[], metavar="MODEL",
+                        help="使用该传感器型号的项目（中文型号或映射后的名称，可重复）")
+    parser.add_argument("--comm", action="append", default=[], metavar="VALUE",
+                        help="使用该通信方式的项目（可重复）")
+    parser.add_argument("--version", action="append", default=[], help="限定版本号（可重复）")
+    parser.add_argument("--param", help="输出该参数在各项目中的取值")
+    parser.add_argument("--sql", help="直接执行只读SQL")
+    parser.add_argument("--json", action="store_true", help="以JSON输出")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.database):
+        print(f"❌ 项目库不存在: {args.database}", file=sys.stderr)
+        return 1
+
+    converter = CSVToJSONConverter(args.config)
+    start = time.perf_counter()
+    with ProjectStore(args.database, converter) as store:
+        if args.sql:
+            store.db.execute("PRAGMA query_only = ON")
+            try:
+                cursor = store.db.execute(args.sql)
+            except sqlite3.Error as e:
+                print(f"❌ SQL错误: {e}", file=sys.stderr)
+                return 1
+            columns = [column[0] for column in cursor.description or ()]
+            results = [dict(zip(columns, row)) for row in cursor]
+            lines = ["\t".join("" if value is None else str(value) for value in row.values()) for row in results]
+        elif args.param:
+            results = [{"project": project_id, "section": section, "value": value}
+                       for project_id, section, value in store.param_values(
+                           args.param, args.sensor, args.comm, args.version)]
+            lines = [f"{row['project']}\t{row['section']}\t{json.dumps(row['value'], ensure_ascii=False)}"
+                     for row in results]
+        else:
+            results = store.find_projects(args.sensor, args.comm, args.version)
+            lines = results
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=4, ensure_ascii=False))
+    else:
+        for line in lines:
+            print(line)
+    print(f"{len(results)} 条结果，{elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合并多个表格的结果到同一个result.json
+旁路索引记录每个项目在result.json中的字节范围、提供该项目的全部表格和块哈希，
+更新时只重新解析发生变化的项目，其余项目按字节原样拷贝，文件通过替换原子写入
+"""
+
+import argparse
+import json
+import mmap
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_index import CSVRowIndex
+from csv_to_json_converter import CSVToJSONConverter
+from sheet_diff import block_hashes
+
+
+def serialize_project(project_id: str, project_data: Dict[str, Any]) -> bytes:
+    """
+    序列化单个项目，与json.dumps(整个结果, indent=4, ensure_ascii=False)中对应的片段完全一致
+    """
+    return CSVToJSONConverter.serialize_project(project_id, project_data).encode('utf-8')
+
+
+class MergedResult:
+    """合并后的result.json及其索引"""
+
+    INDEX_SUFFIX = ".index.json"
+    FORMAT_VERSION = 2
+
+    def __init__(self, result_path: str, converter: Optional[CSVToJSONConverter] = None):
+        """
+        Args:
+            result_path: 合并结果的路径
+            converter: 用于解析表格的转换器
+        """
+        self.result_path = result_path
+        self.converter = converter or CSVToJSONConverter()
+        # 项目ID -> 片段：(起始, 结束) 表示旧文件中的字节范围，bytes 表示新生成的片段
+        self.fragments: Dict[str, Any] = {}
+        # 项目ID -> 含有该版本的全部表格，按更新顺序排列，最后一个为当前内容的来源
+        self.providers: Dict[str, List[str]] = {}
+        # 表格路径 -> {"size", "mtime_ns", "config": 配置摘要, "blocks": {版本号: 哈希}}
+        self.sheets: Dict[str, Dict[str, Any]] = {}
+        # 是否有需要写回的修改
+        self.dirty = False
+        self._load()
+
+    @property
+    def index_path(self) -> str:
+        """索引文件路径"""
+        return self.result_path + self.INDEX_SUFFIX
+
+    def _load(self):
+        """读取索引；索引缺失或与result.json不一致时，完整解析result.json重建"""
+        if not os.path.exists(self.result_path):
+            return
+        stat = os.stat(self.result_path)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if (index.get("format") == self.FORMAT_VERSION
+                    and index.get("size") == stat.st_size
+                    and index.get("mtime_ns") == stat.st_mtime_ns):
+                for project_id, start, end, providers in index["projects"]:
+                    self.fragments[project_id] = (start, end)
+                    if providers:
+                        self.providers[project_id] = list(providers)
+                self.sheets = index.get("sheets", {})
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        # 重建：来源未知，之后的更新会重新解析对应表格的全部项目
+        with open(self.result_path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        for project_id, project_data in existing.items():
+            self.fragments[project_id] = serialize_project(project_id, project_data)
+
+    def upsert_sheet(self, csv_path: str) -> Dict[str, int]:
+        """
+        用一个表格的内容更新结果，只解析新增或发生变化的项目块
+
+        同一版本出现在多个表格中时，以最后更新（内容发生变化）的表格为准；该表格删除这个版本后，
+        改用仍含有该版本的其他表格重新解析，所有表格都不再含有时才从结果中删除。
+        映射配置变化后，已转换的项目视为过期，表格中的全部项目重新解析
+
+        Returns:
+            {"added", "updated", "removed", "unchanged"} 各自的项目数
+        """
+        sheet_key = os.path.abspath(csv_path)
+        stat = os.stat(csv_path)
+        previous = self.sheets.get(sheet_key, {})
+        config_digest = self.converter.config_digest
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+        if (previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns
+                and previous.get("config") == config_digest):
+            # 表格和配置都未修改，无需读取
+            stats["unchanged"] = len(previous.get("blocks", {}))
+            return stats
+
+        self.dirty = True
+        index = CSVRowIndex.load_or_build(csv_path)
+        hashes = block_hashes(index)
+        # 配置变化后旧的块哈希不能说明项目未变
+        previous_blocks = previous.get("blocks", {}) if previous.get("config") == config_digest else {}
+
+        for version, (digest, start_row, stop_row) in hashes.items():
+            project_id = self.converter.project_id(version)
+            providers = self.providers.setdefault(project_id, [])
+            if previous_blocks.get(version) == digest and project_id in self.fragments and sheet_key in providers:
+                stats["unchanged"] += 1
+                continue
+            project_data = self.converter.parse_project_block(index.read_rows(start_row, stop_row))[0]
+            stats["updated" if project_id in self.fragments else "added"] += 1
+            self.fragments[project_id] = serialize_project(project_id, project_data)
+            if sheet_key in providers:
+                providers.remove(sheet_key)
+            providers.append(sheet_key)
+
+        # 表格中已删除的版本
+        for version in previous.get("blocks", {}):
+            project_id = self.converter.project_id(version)
+            providers = self.providers.get(project_id, [])
+            if version in hashes or sheet_key not in providers:
+                continue
+            was_source = providers[-1] == sheet_key
+            providers.remove(sheet_key)
+            if not was_source:
+                # 当前内容来自其他表格，不受影响
+                continue
+            if self._restore_from_providers(project_id, version):
+                stats["updated"] += 1
+            else:
+                del self.fragments[project_id]
+                del self.providers[project_id]
+                stats["removed"] += 1
+
+        self.sheets[sheet_key] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "config": config_digest,
+            "blocks": {version: digest for version, (digest, _, _) in hashes.items()},
+        }
+        return stats
+
+    def _restore_from_providers(self, project_id: str, version: str) -> bool:
+        """
+        用其余表格中最后更新的一个重新解析该版本，返回是否找到；已不再含有该版本的表格从来源中移除
+        """
+        providers = self.providers[project_id]
+        while providers:
+            try:
+                index = CSVRowIndex.load_or_build(providers[-1])
+                block = index.block_map().get(version)
+            except OSError:
+                block = None
+            if block is not None:
+                project_data = self.converter.parse_project_block(index.read_rows(*block))[0]
+                self.fragments[project_id] = serialize_project(project_id, project_data)
+                return True
+            providers.pop()
+        return False
+
+    def save(self):
+        """原子写入result.json和索引：先写临时文件，再替换"""
+        directory = os.path.dirname(self.result_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.result_path}.{os.getpid()}.tmp"
+        positions: List[Tuple[str, int, int]] = []
+
+        old_file = None
+        old_map = None
+        try:
+            if any(isinstance(fragment, tuple) for fragment in self.fragments.values()):
+                old_file = open(self.result_path, 'rb')
+                old_map = mmap.mmap(old_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+            with open(temp_path, 'wb') as out:
+                if not self.fragments:
+                    out.write(b"{}")
+                else:
+                    out.write(b"{\n")
+                    for i, (project_id, fragment) in enumerate(self.fragments.items()):
+                        if i:
+                            out.write(b",\n")
+                        data = old_map[fragment[0]:fragment[1]] if isinstance(fragment, tuple) else fragment
+                        start = out.tell()
+                        out.write(data)
+                        positions.append((project_id, start, out.tell()))
+                    out.write(b"\n}")
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        finally:
+            if old_map is not None:
+                old_map.close()
+            if old_file is not None:
+                old_file.close()
+
+        os.replace(temp_path, self.result_path)
+        stat = os.stat(self.result_path)
+
+        self.fragments = {project_id: (start, end) for project_id, start, end in positions}
+        index = {
+            "format": self.FORMAT_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "projects": [[project_id, start, end, self.providers.get(project_id, [])]
+                         for project_id, start, end in positions],
+            "sheets": self.sheets,
+        }
+        temp_index = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(temp_index, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        os.replace(temp_index, self.index_path)
+        self.dirty = False
+
+
+def merge_sheets(result_path: str, csv_files: List[str],
+                 converter: Optional[CSVToJSONConverter] = None) -> Dict[str, int]:
+    """把多个表格合并（增量更新）到result_path，返回各类项目数的合计"""
+    merged = MergedResult(result_path, converter)
+    totals = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    for csv_file in csv_files:
+        for key, count in merged.upsert_sheet(csv_file).items():
+            totals[key] += count
+    if merged.dirty or not os.path.exists(result_path):
+        merged.save()
+    return totals
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """
+    主函数
+    
+    Args:
+        argv: 命令行参数，默认读取sys.argv
+        prog: 帮助信息中显示的程序名
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="把多个表格增量合并到同一个result.json")
+    parser.add_argument("csv_files", nargs="+", help="CSV文件")
+    parser.add_argument("-o", "--output", default="output/result.json", help="合并结果路径")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    args = parser.parse_args(argv)
+
+    totals = merge_sheets(args.output, args.csv_files, CSVToJSONConverter(args.config))
+    print(f"新增 {totals['added']}，更新 {totals['updated']}，删除 {totals['removed']}，"
+          f"未变 {totals['unchanged']}: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
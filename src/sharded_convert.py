@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+单个大表格的分片并行转换
+直接在字节层面查找Version块的起始行（不解析CSV），把文件切成若干分片，
+每个分片在进程池中独立转换，结果按分片顺序合并，与顺序转换的输出一致
+"""
+
+import contextlib
+import csv
+import io
+import itertools
+import json
+import mmap
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_index import CSVRowIndex
+from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import MemorySink
+from spill import dump_records, load_records
+
+# 每个进程分到的分片数，分片多一些可以平衡各项目块大小不均的情况
+SHARDS_PER_JOB = 4
+# 统计引号时每次切片的字节数
+_SCAN_CHUNK = 16 * 1024 * 1024
+
+
+class _QuoteParity:
+    """
+    从文件开头到某个位置的引号数的奇偶，奇数表示该位置位于引号内
+
+    按块read统计，不经过mmap：扫描整个文件时进程占用的内存不随文件大小增长
+    """
+
+    def __init__(self, f):
+        self.file = f
+        self.position = 0
+        self.odd = False
+
+    def advance(self, position: int) -> bool:
+        """前进到position（只能向后），返回该位置是否位于引号内"""
+        while self.position < position:
+            stop = min(position, self.position + _SCAN_CHUNK)
+            self.file.seek(self.position)
+            if self.file.read(stop - self.position).count(b'"') % 2:
+                self.odd = not self.odd
+            self.position = stop
+        return self.odd
+
+
+class _ByteRangeReader(io.RawIOBase):
+    """文件中 [start, end) 字节范围的只读原始流，分片按需读取，不整块载入内存"""
+
+    def __init__(self, f, start: int, end: int):
+        f.seek(start)
+        self._file = f
+        self._remaining = end - start
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._file.read(size)
+        buffer[:len(data)] = data
+        self._remaining -= len(data)
+        return len(data)
+
+
+def shard_ranges(csv_path: str, shard_count: int) -> List[Tuple[int, int]]:
+    """
+    把标题行之后的数据切成最多shard_count个字节范围，每个范围（第一个除外）都从一个Version块的起始行开始
+
+    只在引号之外的换行处切分：用从文件开头累计的引号数的奇偶判断换行是否位于引号内。
+    只有标题行时返回一个空范围，空文件返回空列表
+    """
+    size = os.path.getsize(csv_path)
+    if size == 0:
+        return []
+    with open(csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        parity = _QuoteParity(f)
+
+        def next_row_start(position: int, version_only: bool) -> int:
+            """position之后第一个（Version块的）行起始位置，没有时返回文件大小"""
+            while True:
+                newline = mm.find(b'\n', position)
+                if newline == -1:
+                    return size
+                position = newline + 1
+                if parity.advance(position):
+                    continue
+                if not version_only or (position < size
+                                        and CSVRowIndex._first_field(mm, position, size)):
+                    return position
+
+        cuts = [next_row_start(0, False)]
+        for i in range(1, shard_count):
+            target = cuts[0] + (size - cuts[0]) * i // shard_count
+            cut = next_row_start(max(target, cuts[-1]) - 1, True)
+            if cut >= size:
+                break
+            if cut > cuts[-1]:
+                cuts.append(cut)
+    return list(zip(cuts, cuts[1:] + [size]))
+
+
+def project_chunk(converter: CSVToJSONConverter, project_id: str, project_data: Dict[str, Any],
+                  fmt: str) -> str:
+    """单个项目的输出片段：json为result.json中的片段，jsonl为一行"""
+    if fmt == "json":
+        return converter.serialize_project(project_id, project_data)
+    return json.dumps({project_id: project_data}, ensure_ascii=False) + "\n"
+
+
+def iter_shard_chunks(converter: CSVToJSONConverter, csv_path: str, start: int, end: int,
+                      fmt: str) -> Iterator[tuple]:
+    """转换一个分片，边读边逐个产出 (项目ID, 输出片段)"""
+    with open(csv_path, 'rb') as f, \
+            io.TextIOWrapper(io.BufferedReader(_ByteRangeReader(f, start, end)), encoding='utf-8',
+                             newline=None) as text:
+        # 分片不含标题行，补一个空标题行；与按文本模式打开文件一致，统一换行符
+        rows = itertools.chain(([],), csv.reader(text))
+        for project_id, project_data in converter.iter_projects(rows):
+            yield project_id, project_chunk(converter, project_id, project_data, fmt)
+
+
+# 子进程中复用的转换器
+_worker_converter = None
+
+
+def _init_worker(config_file: str, memory_limit: Optional[int], groups: Optional[List[str]] = None,
+                 validate: bool = False):
+    """子进程初始化：只加载一次配置"""
+    global _worker_converter
+    _worker_converter = CSVToJSONConverter(config_file, output_sink=MemorySink(), memory_limit=memory_limit,
+                                           groups=groups, validate=validate)
+
+
+def _convert_shard(csv_path: str, byte_range: Tuple[int, int], fmt: str, spill_dir: Optional[str] = None):
+    """
+    在子进程中转换一个分片，校验未通过时抛出OutputValidationError
+
+    spill_dir为空时返回片段列表；否则片段写入其中的临时文件，返回文件路径（见spill.dump_records）
+    """
+    chunks = iter_shard_chunks(_worker_converter, csv_path, byte_range[0], byte_range[1], fmt)
+    return dump_records(chunks, spill_dir) if spill_dir is not None else list(chunks)
+
+
+def iter_worker_results(results: Iterable, spill_dir: Optional[str]) -> Iterator[tuple]:
+    """依次展开子进程返回的片段列表，或spill_dir中的片段文件"""
+    for result in results:
+        yield from load_records(result) if spill_dir is not None else result
+
+
+def iter_sharded_chunks(csv_path: str, fmt: str = "json", jobs: Optional[int] = None,
+                        config_file: str = "config/mapping_config.json",
+                        memory_limit: Optional[int] = None,
+                        groups: Optional[List[str]] = None, validate: bool = False) -> Iterator[tuple]:
+    """
+    把一个CSV切成分片并行转换，按原文件中的顺序产出 (项目ID, 输出片段)
+
+    同一版本出现多次时会产出多次，去重由调用方完成（如convert.py的write_chunks）。
+    memory_limit生效时各分片的片段经临时磁盘文件交回，不在进程间整块传递
+
+    Args:
+        csv_path: UTF-8编码的CSV文件
+        fmt: json或jsonl
+        jobs: 进程数，默认为CPU核数
+        groups: 只解析这些分组，见CSVToJSONConverter的groups
+        validate: 校验每个项目，有问题的分片在迭代到它时抛出OutputValidationError
+    """
+    jobs = jobs or os.cpu_count() or 1
+    ranges = shard_ranges(csv_path, jobs * SHARDS_PER_JOB)
+    spill_context = tempfile.TemporaryDirectory() if memory_limit is not None else contextlib.nullcontext()
+    with spill_context as spill_dir, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                initargs=(config_file, memory_limit, groups, validate)) as executor:
+        results = executor.map(_convert_shard, itertools.repeat(csv_path), ranges, itertools.repeat(fmt),
+                               itertools.repeat(spill_dir))
+        yield from iter_worker_results(results, spill_dir)
+
+
+def convert_csv_sharded(csv_path: str, jobs: Optional[int] = None,
+                        config_file: str = "config/mapping_config.json") -> str:
+    """
+    分片并行转换为JSON字符串，与convert_csv_to_json的返回值一致（不生成config.yaml）
+    """
+    fragments = {}
+    for project_id, chunk in iter_sharded_chunks(csv_path, "json", jobs, config_file):
+        # 同一项目ID位置取第一次出现，内容取最后一次，与字典赋值一致
+        fragments[project_id] = chunk
+    if not fragments:
+        return "{}"
+    return "{\n" + ",\n".join(fragments.values()) + "\n}"
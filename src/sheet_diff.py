@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+两个表格版本之间的增量对比
+按Version块的原始字节计算哈希，哈希相同的项目直接跳过，
+只解析发生变化的项目，开销与变化量而不是文件大小相关
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+# 添加src目录到路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from csv_index import CSVRowIndex
+from csv_to_json_converter import CSVToJSONConverter
+
+
+def block_hashes(index: CSVRowIndex) -> Dict[str, tuple]:
+    """
+    计算每个项目块的哈希
+
+    Returns:
+        {版本号: (哈希, 起始行, 结束行)}，同一版本出现多次时以最后一次为准
+    """
+    hashes = {}
+    if index.size == 0:
+        return hashes
+    with open(index.csv_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for version, start_row, stop_row in index.project_ranges():
+            start, end = index.byte_range(start_row, stop_row)
+            digest = hashlib.blake2b(mm[start:end], digest_size=16).hexdigest()
+            hashes[version] = (digest, start_row, stop_row)
+    return hashes
+
+
+def _same_value(old: Any, new: Any) -> bool:
+    """值相同且类型相同（1和1.0视为不同）"""
+    if type(old) is not type(new):
+        return False
+    if hasattr(old, "tolist"):
+        # 启用npy_threshold时的NumPy数组
+        return old.shape == new.shape and old.dtype == new.dtype and (old == new).all()
+    return old == new
+
+
+def _json_default(value: Any) -> Any:
+    """NumPy数组按列表输出"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def diff_mapping(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    对比两个字典，只返回非空的 added / removed / changed 部分
+    """
+    delta = {}
+    added = {key: value for key, value in new.items() if key not in old}
+    removed = {key: value for key, value in old.items() if key not in new}
+    changed = {key: {"old": old[key], "new": value} for key, value in new.items()
+               if key in old and not _same_value(old[key], value)}
+    if added:
+        delta["added"] = added
+    if removed:
+        delta["removed"] = removed
+    if changed:
+        delta["changed"] = changed
+    return delta
+
+
+def diff_project(old_block: tuple, new_block: tuple) -> Dict[str, Any]:
+    """
+    对比两个已解析的项目块（parse_project_block的返回值），只返回有变化的部分
+    """
+    old_data, old_params, _ = old_block
+    new_data, new_params, _ = new_block
+    sections = {
+        "sensor": diff_mapping(old_data["sensor"], new_data["sensor"]),
+        "comm": diff_mapping(old_data["comm"], new_data["comm"]),
+    }
+    # 参数按YAML段落对比，如 sensor_params、robot_params
+    for section in {**old_params, **new_params}:
+        sections[f"{section}_params"] = diff_mapping(old_params.get(section, {}),
+                                                     new_params.get(section, {}))
+    return {name: delta for name, delta in sections.items() if delta}
+
+
+def diff_csv_files(old_csv: str, new_csv: str,
+                   converter: Optional[CSVToJSONConverter] = None) -> Dict[str, Any]:
+    """
+    对比两个CSV文件
+
+    Returns:
+        {
+            "added_projects": {项目ID: {"project": 项目结构, "<段落>_params": ...}},
+            "removed_projects": [项目ID],
+            "changed_projects": {项目ID: {分组: {"added"/"removed"/"changed": ...}}},
+            "unchanged_count": 哈希相同而跳过的项目数
+        }
+    """
+    converter = converter or CSVToJSONConverter()
+    old_index = CSVRowIndex.load_or_build(old_csv)
+    new_index = CSVRowIndex.load_or_build(new_csv)
+    old_hashes = block_hashes(old_index)
+    new_hashes = block_hashes(new_index)
+
+    def parse(index: CSVRowIndex, start_row: int, stop_row: int) -> tuple:
+        return converter.parse_project_block(index.read_rows(start_row, stop_row))
+
+    delta = {
+        "added_projects": {},
+        "removed_projects": [],
+        "changed_projects": {},
+        "unchanged_count": 0,
+    }
+    for version, (digest, start_row, stop_row) in new_hashes.items():
+        project_id = converter.project_id(version)
+        if version not in old_hashes:
+            project_data, section_params, _ = parse(new_index, start_row, stop_row)
+            delta["added_projects"][project_id] = {"project": project_data}
+            for section, params in section_params.items():
+                delta["added_projects"][project_id][f"{section}_params"] = params
+            continue
+        old_digest, old_start, old_stop = old_hashes[version]
+        if old_digest == digest:
+            delta["unchanged_count"] += 1
+            continue
+        changes = diff_project(parse(old_index, old_start, old_stop), parse(new_index, start_row, stop_row))
+        if changes:
+            delta["changed_projects"][project_id] = changes
+        else:
+            # 只有格式或注释变化
+            delta["unchanged_count"] += 1
+
+    delta["removed_projects"] = [converter.project_id(version) for version in old_hashes
+                                 if version not in new_hashes]
+    return delta
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None):
+    """
+    主函数
+    
+    Args:
+        argv: 命令行参数，默认读取sys.argv
+        prog: 帮助信息中显示的程序名
+    """
+    parser = argparse.ArgumentParser(prog=prog, description="对比两个表格版本，输出结构化的增量")
+    parser.add_argument("old_csv", help="旧版本CSV文件")
+    parser.add_argument("new_csv", help="新版本CSV文件")
+    parser.add_argument("-o", "--output", help="增量JSON的保存路径，默认输出到标准输出")
+    parser.add_argument("--config", default="config/mapping_config.json", help="映射配置文件路径")
+    args = parser.parse_args(argv)
+
+    delta = diff_csv_files(args.old_csv, args.new_csv, CSVToJSONConverter(args.config))
+    json_str = json.dumps(delta, indent=4, ensure_ascii=False, default=_json_default)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(json_str)
+    else:
+        print(json_str)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内存有上限的累加器
+记录先保存在内存中，估算大小超过上限后转存到临时SQLite数据库（磁盘），
+读取时按键去重并按第一次出现的顺序输出，排序和去重由SQLite在磁盘上完成；
+以及子进程通过临时文件把逐条产出的结果交给父进程的dump_records/load_records
+"""
+
+import os
+import pickle
+import sqlite3
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# 每条记录在估算大小之外额外计入的开销（元组、字符串对象头等）
+RECORD_OVERHEAD = 200
+
+
+class SpillTable:
+    """
+    只追加的记录表，每条记录为 (分组, 键, 值, 附加信息)
+
+    iter_unique按键去重，与字典赋值的语义一致：位置取该键第一次出现，值取最后一次；
+    附加信息取该键（不区分分组）最后一个非None的值，用于参数解释等跨分组共享的信息
+    """
+
+    def __init__(self, memory_limit: Optional[int] = None):
+        """
+        Args:
+            memory_limit: 内存中记录的估算字节数上限，为None时始终保存在内存中
+        """
+        self.memory_limit = memory_limit
+        self._records: List[Tuple[str, str, Any, Optional[str]]] = []
+        self._size = 0
+        self._count = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._indexed = False
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def spilled(self) -> bool:
+        """是否已转存到磁盘"""
+        return self._db is not None
+
+    def append(self, group: str, key: str, value: Any, extra: Optional[str] = None):
+        """追加一条记录，值为str或bytes"""
+        self._records.append((group, key, value, extra))
+        self._size += len(key) + len(value) + (len(extra) if extra else 0) + RECORD_OVERHEAD
+        self._count += 1
+        if self.memory_limit is not None and self._size > self.memory_limit:
+            self._flush()
+
+    def _flush(self):
+        """把内存中的记录写入临时数据库"""
+        if self._db is None:
+            # 空文件名为私有的临时磁盘数据库，关闭时自动删除
+            self._db = sqlite3.connect("")
+            # 页缓存不超过上限的一半（单位KiB）
+            self._db.execute(f"PRAGMA cache_size = -{max(self.memory_limit // 2048, 64)}")
+            self._db.execute("PRAGMA temp_store = FILE")
+            self._db.execute("PRAGMA journal_mode = OFF")
+            self._db.execute("PRAGMA synchronous = OFF")
+            self._db.execute("CREATE TABLE records (seq INTEGER PRIMARY KEY, grp TEXT, key TEXT, "
+                             "value BLOB, extra TEXT)")
+        self._db.executemany("INSERT INTO records (grp, key, value, extra) VALUES (?, ?, ?, ?)",
+                             self._records)
+        self._db.commit()
+        self._records = []
+        self._size = 0
+
+    def iter_unique(self, group: str) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """按键去重后依次产出该分组的 (键, 值, 附加信息)"""
+        if self._db is None:
+            yield from self._iter_unique_in_memory(group)
+            return
+
+        self._flush()
+        if not self._indexed:
+            self._db.execute("CREATE INDEX records_group_key ON records (grp, key, seq)")
+            self._db.execute("CREATE INDEX records_extra ON records (key, seq) WHERE extra IS NOT NULL")
+            self._indexed = True
+        cursor = self._db.execute(
+            "SELECT r.key, r.value, "
+            "  (SELECT e.extra FROM records e WHERE e.key = r.key AND e.extra IS NOT NULL "
+            "   ORDER BY e.seq DESC LIMIT 1) "
+            "FROM (SELECT key, MIN(seq) AS first_seq, MAX(seq) AS last_seq "
+            "      FROM records WHERE grp = ? GROUP BY key) g "
+            "JOIN records r ON r.seq = g.last_seq "
+            "ORDER BY g.first_seq", (group,))
+        while True:
+            batch = cursor.fetchmany(1024)
+            if not batch:
+                break
+            yield from batch
+
+    def _iter_unique_in_memory(self, group: str) -> Iterator[Tuple[str, Any, Optional[str]]]:
+        """未转存时直接用字典去重"""
+        values: Dict[str, Any] = {}
+        extras: Dict[str, str] = {}
+        for record_group, key, value, extra in self._records:
+            if record_group == group:
+                values[key] = value
+            if extra is not None:
+                extras[key] = extra
+        for key, value in values.items():
+            yield key, value, extras.get(key)
+
+    def close(self):
+        """释放内存中的记录并删除临时数据库"""
+        self._records = []
+        self._size = 0
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            self._indexed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def dump_records(records: Iterable[Any], directory: str) -> str:
+    """
+    把记录逐条pickle到directory下的新临时文件，返回文件路径
+
+    子进程用它返回结果：只有文件路径经进程池传回，结果不在子进程或父进程的内存中组装。
+    产出记录时出错则删除文件后抛出
+    """
+    fd, path = tempfile.mkstemp(suffix=".records", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for record in records:
+                pickle.dump(record, f, pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+
+def load_records(path: str) -> Iterator[Any]:
+    """依次产出dump_records写入的记录，读完后删除文件"""
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                break
+    os.remove(path)
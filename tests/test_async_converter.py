@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AsyncCSVToJSONConverter的测试：转换不阻塞事件循环、排队中的调用可以取消、并发数不超过上限
+"""
+
+import asyncio
+import csv
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from async_converter import AsyncCSVToJSONConverter
+from csv_to_json_converter import CSVToJSONConverter
+
+CONFIG_FILE = os.path.join(ROOT, "config", "mapping_config.json")
+CALLS = 64
+# 事件循环两次调度之间允许的最大间隔（秒），转换在事件循环中执行时会远超这个值
+MAX_TICK_GAP = 0.5
+
+
+@pytest.fixture(autouse=True)
+def work_dir(tmp_path, monkeypatch):
+    """转换器附带生成的output/config.yaml写在临时目录中，不留在仓库里"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(scope="module")
+def sheet(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("async") / "sheet.csv")
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Version", "Group", "Type", "Value", "参数解释", "Define"])
+        for project in range(200):
+            writer.writerow([str(3000 + project), "Sensor_Type", "雷达", "欢创PMA2", "", ""])
+            writer.writerow(["", "Trans", "rpmsg", "mailbox", "", ""])
+            writer.writerow(["", "Sensor_Parameter", "雷达距离", f"0.{project}", "雷达距离", "LaserBiasDist"])
+            for i in range(10):
+                writer.writerow(["", "", f"参数{i}", str(project * 10 + i), f"参数{i}", f"P{i}"])
+    return path
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """记录同时提交到线程池、尚未结束的调用数的峰值"""
+
+    def __init__(self, max_workers: int):
+        super().__init__(max_workers=max_workers)
+        self._count_lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def submit(self, *args, **kwargs):
+        with self._count_lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        future = super().submit(*args, **kwargs)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, _):
+        with self._count_lock:
+            self.active -= 1
+
+
+def test_calls_complete_without_blocking_loop(sheet):
+    converter = CSVToJSONConverter(CONFIG_FILE)
+    expected_json = converter.convert_csv_to_json(sheet)
+    expected_yaml = converter.convert_csv_to_yaml(sheet, silent=True)
+
+    async def run():
+        gaps = []
+        done = asyncio.Event()
+
+        async def ticker():
+            last = time.perf_counter()
+            while not done.is_set():
+                await asyncio.sleep(0.005)
+                now = time.perf_counter()
+                gaps.append(now - last)
+                last = now
+
+        async with AsyncCSVToJSONConverter(converter, max_concurrency=4) as async_converter:
+            tick = asyncio.create_task(ticker())
+            calls = [async_converter.aconvert_csv_to_json(sheet) if i % 2 == 0
+                     else async_converter.aconvert_csv_to_yaml(sheet, silent=True)
+                     for i in range(CALLS)]
+            results = await asyncio.gather(*calls)
+            done.set()
+            await tick
+        return results, gaps
+
+    results, gaps = asyncio.run(run())
+    assert results == [expected_json if i % 2 == 0 else expected_yaml for i in range(CALLS)]
+    assert gaps, "转换期间ticker没有运行"
+    assert max(gaps) < MAX_TICK_GAP
+
+
+def test_concurrency_bound(sheet):
+    # 线程池本身比并发上限大，峰值只受max_concurrency约束
+    executor = CountingExecutor(max_workers=8)
+
+    async def run():
+        async_converter = AsyncCSVToJSONConverter(CSVToJSONConverter(CONFIG_FILE), max_concurrency=3,
+                                                  executor=executor)
+        return await asyncio.gather(*(async_converter.aconvert_csv_to_json(sheet) for _ in range(24)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        executor.shutdown()
+    assert len(results) == 24
+    assert executor.peak == 3
+
+
+def test_queued_call_can_be_cancelled(sheet):
+    converter = CSVToJSONConverter(CONFIG_FILE)
+    convert = converter.convert_csv_to_json
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def blocking_convert(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        return convert(*args)
+
+    # 实例属性覆盖方法，aconvert_csv_to_json调用时取到的是阻塞版本
+    converter.convert_csv_to_json = blocking_convert
+
+    async def run():
+        async with AsyncCSVToJSONConverter(converter, max_concurrency=1) as async_converter:
+            first = asyncio.create_task(async_converter.aconvert_csv_to_json(sheet))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            # 唯一的名额被第一个调用占用，第二个调用在排队
+            queued = asyncio.create_task(async_converter.aconvert_csv_to_json(sheet))
+            await asyncio.sleep(0.05)
+            assert not queued.done()
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+
+            release.set()
+            first_result = await first
+            # 名额已归还，之后的调用正常完成
+            later_result = await async_converter.aconvert_csv_to_json(sheet)
+            return first_result, later_result
+
+    first_result, later_result = asyncio.run(run())
+    assert first_result == later_result == convert(sheet)
+    # 被取消的调用没有执行
+    assert len(calls) == 2
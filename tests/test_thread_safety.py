@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享转换器的线程安全压力测试
+同一个CSVToJSONConverter实例在线程池中并发执行数百次转换，每个输出（及启用校验时的问题）都与单独转换的结果逐字节比较
+"""
+
+import csv
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+from csv_to_json_converter import CSVToJSONConverter
+from output_sinks import MemorySink
+
+CONFIG_FILE = os.path.join(ROOT, "config", "mapping_config.json")
+SHEET_COUNT = 8
+CONVERSIONS = 480
+THREADS = 16
+
+LIDARS = ["欢创PMA2", "一微T5C", "乐动STL50", "欢创D3A3"]
+
+
+def write_sheet(path: str, sheet: int):
+    """每个表格的版本号、传感器、参数值和参数解释都不同，串用时会在输出中体现"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Version", "Group", "Type", "Value", "参数解释", "Define"])
+        for project in range(3):
+            writer.writerow([f"{sheet}{project:02d}", "Sensor_Type", "雷达", LIDARS[(sheet + project) % len(LIDARS)],
+                             "", ""])
+            writer.writerow(["", "", "线结构光", "一微ALF03" if (sheet + project) % 2 else "无", "", ""])
+            writer.writerow(["", "Trans", "rpmsg", "mailbox", "", ""])
+            writer.writerow(["", "Sensor_Parameter", "雷达距离", f"0.{sheet}{project}",
+                             f"表格{sheet}的雷达距离", "LaserBiasDist"])
+            writer.writerow(["", "", "轮廓", f"[[{sheet}, {project}], [{project}, {sheet}]]",
+                             f"表格{sheet}的轮廓", "Footprint"])
+            for i in range(20):
+                writer.writerow(["", "", f"参数{i}", str(sheet * 1000 + project * 100 + i),
+                                 f"表格{sheet}参数{i}", f"P{i}"])
+            if sheet % 2:
+                # 校验时报告的问题，带有表格编号
+                writer.writerow(["", "", "坏值", f"a: {sheet}", "", f"Bad{sheet}"])
+            writer.writerow(["", "robot", "半径", f"0.{sheet + 1}", f"表格{sheet}的半径", "robot_radius"])
+
+
+def convert(converter: CSVToJSONConverter, task: tuple) -> tuple:
+    """执行一次转换，返回 (主输出, 输出目标中的config.yaml) 的字节和本次调用的校验问题"""
+    kind, path = task
+    sink = MemorySink()
+    issues = [] if converter.validator is not None else None
+    if kind == "json":
+        result = converter.convert_csv_to_json(path, sink=sink, issues=issues)
+    elif kind == "yaml":
+        result = converter.convert_csv_to_yaml(path, sink=sink, issues=issues)
+    else:
+        result = repr(converter.parse_csv_to_dict(path, sink=sink, issues=issues))
+    return result.encode('utf-8'), (sink.get("config.yaml") or "").encode('utf-8'), issues
+
+
+@pytest.fixture(scope="module")
+def sheets(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("sheets")
+    paths = []
+    for sheet in range(SHEET_COUNT):
+        path = str(directory / f"sheet{sheet}.csv")
+        write_sheet(path, sheet)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("memory_limit", [None, 4096])
+@pytest.mark.parametrize("validate", [False, True])
+def test_shared_converter_in_thread_pool(sheets, memory_limit, validate):
+    tasks = [(kind, path) for path in sheets for kind in ("json", "yaml", "dict")]
+    # 每个任务单独新建转换器得到期望输出
+    expected = {task: convert(CSVToJSONConverter(CONFIG_FILE, memory_limit=memory_limit, validate=validate), task)
+                for task in tasks}
+    # 各表格的输出互不相同，串用一定能被发现
+    assert len({output for output, _, _ in expected.values()}) == len(tasks)
+    if validate:
+        assert any(issues for _, _, issues in expected.values())
+
+    shared = CSVToJSONConverter(CONFIG_FILE, memory_limit=memory_limit, validate=validate)
+    workload = [tasks[i % len(tasks)] for i in range(CONVERSIONS)]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(lambda task: convert(shared, task), workload))
+
+    mismatches = [task for task, result in zip(workload, results) if result != expected[task]]
+    assert not mismatches, f"{len(mismatches)} 次并发转换的输出与单独转换不同，如 {mismatches[0]}"